@@ -0,0 +1,101 @@
+"""
+Serializer benchmark
+
+Compare per-call latency of the reflective path
+(CDataJSONEncoder -> pydantic model_validate_json -> JSON response bytes)
+against the generated serializer on fully populated scoring and telemetry buffers,
+with all mapped vehicle slots (padded) and with active vehicles only.
+
+Run from repository root:
+
+    python -m benchmarks.serializer [--repeat 50] [--vehicles 24]
+"""
+import argparse
+import ctypes
+import random
+import time
+import statistics
+
+import model
+import serializer
+from rf2_data import rf2_data as rF2data
+
+
+def populate(data, rng=None):
+    """Fill every field of a ctypes structure with random plausible values"""
+    rng = rng or random.Random(0)
+    for name, ftype, *_ in data._fields_:
+        if issubclass(ftype, ctypes.Structure):
+            populate(getattr(data, name), rng)
+        elif issubclass(ftype, ctypes.Array):
+            array = getattr(data, name)
+            if ftype._type_ is ctypes.c_char:
+                setattr(data, name, f"{name[1:]} {rng.randrange(100)}".encode()[:ftype._length_ - 1])
+            elif issubclass(ftype._type_, ctypes.Structure):
+                for item in array:
+                    populate(item, rng)
+            else:
+                for index in range(ftype._length_):
+                    array[index] = random_value(ftype._type_, rng)
+        else:
+            setattr(data, name, random_value(ftype, rng))
+    return data
+
+
+def random_value(ctype, rng):
+    """Random value of a simple ctypes type"""
+    if ctype in (ctypes.c_double, ctypes.c_float):
+        return rng.uniform(-1000, 1000)
+    if ctype is ctypes.c_bool:
+        return rng.random() < 0.5
+    if ctype is ctypes.c_char:
+        return b"N"
+    return rng.randrange(0, 100)
+
+
+def measure(func, data, repeat):
+    """Per-call latency samples in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--vehicles", type=int, default=24)
+    args = parser.parse_args()
+
+    cases = (
+        ("scoring", rF2data.rF2Scoring, model.rF2Scoring),
+        ("telemetry", rF2data.rF2Telemetry, model.rF2Telemetry),
+    )
+    for name, ctype, response_model in cases:
+        data = populate(ctype())
+        if ctype is rF2data.rF2Scoring:
+            data.mScoringInfo.mNumVehicles = args.vehicles
+        else:
+            data.mNumVehicles = args.vehicles
+        direct = serializer.Serializer(ctype)
+        paths = (
+            ("pydantic", lambda d: response_model.build(d).model_dump_json().encode()),
+            ("generated", lambda d: direct.dumps(d, padded=True)),
+            ("active", direct.dumps),
+        )
+        if paths[0][1](data) != paths[1][1](data):
+            print(f"{name}: WARNING output differs between paths")
+        results = {}
+        for path, func in paths:
+            samples = measure(func, data, args.repeat)
+            results[path] = statistics.median(samples)
+            print(f"{name:10} {path:10} median {results[path]:8.3f} ms"
+                  f"  min {min(samples):8.3f} ms")
+        for path in ("generated", "active"):
+            print(f"{name:10} speedup    {results['pydantic'] / results[path]:8.1f}x ({path})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Benchmark suite
+
+Measure the shared memory reader (rF2MMap.copy_access per buffer),
+the generated serializer serving /scoring/ and /telemetry/ (padded and
+active vehicles only), CDataJSONEncoder, pydantic model build,
+session.Session construction, and end-to-end HTTP throughput and
+p50/p99 latency of /scoring/, /telemetry/ and /session/ with concurrent
+clients against populated shared memory buffers. Results are written to a JSON file, pass a
+previous result file with --compare to print the ratios.
+
+Run from repository root:
+
+    python -m benchmarks.suite [--output results.json] [--compare previous.json]
+"""
+import argparse
+import ctypes
+import datetime
+import http.client
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import model
+import serializer
+import session
+from benchmarks.serializer import populate
+from rf2_data import rf2_data as rF2data
+from rf2_data.buffers import BUFFER_TYPES, MMAP_NAMES
+from rf2_data.emulator import Emulator
+from rf2_data.replay import SharedMemoryWriter
+from rf2_data.sim_info_sync import rF2MMap, VERSION_FORMAT
+
+ENDPOINTS = ("/scoring/", "/telemetry/", "/session/")
+
+
+def summarize(samples):
+    """Latency summary (milliseconds) of per-call samples in seconds"""
+    samples = sorted(sample * 1000 for sample in samples)
+    return {
+        "samples": len(samples),
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p99_ms": samples[min(int(len(samples) * 0.99), len(samples) - 1)],
+    }
+
+
+def measure(func, repeat):
+    """Per-call latency summary of func()"""
+    func()  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def populate_buffers(vehicles):
+    """Write populated buffers into shared memory, return the written data"""
+    writer = SharedMemoryWriter(buffers=BUFFER_TYPES)
+    written = {}
+    for name, rf2_data in BUFFER_TYPES.items():
+        data = populate(rf2_data())
+        data.mVersionUpdateBegin = data.mVersionUpdateEnd = 1
+        if rf2_data is rF2data.rF2Scoring:
+            data.mScoringInfo.mNumVehicles = vehicles
+        elif rf2_data is rF2data.rF2Telemetry:
+            data.mNumVehicles = vehicles
+        writer.write(name, 1, bytes(data))
+        written[name] = data
+    writer.close()
+    return written
+
+
+def bench_local(data, repeat):
+    """In-process benchmarks"""
+    results = {}
+    for name, rf2_data in BUFFER_TYPES.items():
+        mmap_info = rF2MMap(MMAP_NAMES[name], rf2_data)
+        mmap_info.create(0)
+        shared = mmap_info.platform_mmap(MMAP_NAMES[name], ctypes.sizeof(rf2_data))
+
+        def changed_copy():
+            version = VERSION_FORMAT.unpack_from(shared, rf2_data.mVersionUpdateEnd.offset)[0] + 1
+            VERSION_FORMAT.pack_into(shared, rf2_data.mVersionUpdateBegin.offset, version)
+            VERSION_FORMAT.pack_into(shared, rf2_data.mVersionUpdateEnd.offset, version)
+            mmap_info.copy_access()
+
+        results[f"reader.copy_access.{name}.changed"] = measure(changed_copy, repeat)
+        results[f"reader.copy_access.{name}.unchanged"] = measure(mmap_info.copy_access, repeat)
+        shared.close()
+        mmap_info.close()
+
+    scoring, telemetry = data["scoring"], data["telemetry"]
+    for name, rf2_data in (("scoring", rF2data.rF2Scoring), ("telemetry", rF2data.rF2Telemetry)):
+        dumps = serializer.projection(rf2_data, ()).dumps  # as served by the API
+        results[f"serializer.{name}.active"] = measure(lambda: dumps(data[name]), repeat)
+        results[f"serializer.{name}.padded"] = measure(lambda: dumps(data[name], True), repeat)
+    results["encoder.scoring"] = measure(
+        lambda: json.dumps(scoring, cls=model.CDataJSONEncoder), repeat)
+    results["encoder.telemetry"] = measure(
+        lambda: json.dumps(telemetry, cls=model.CDataJSONEncoder), repeat)
+    results["model.scoring.build"] = measure(lambda: model.rF2Scoring.build(scoring), repeat)
+    results["model.telemetry.build"] = measure(lambda: model.rF2Telemetry.build(telemetry), repeat)
+    scoring_model = model.rF2Scoring.build(scoring)
+    results["session.construct"] = measure(
+        lambda: session.Session(scoring_model, True), repeat)
+    return results
+
+
+def start_server(port):
+    """Start API server process, wait until it answers"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"])
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/healthz")
+            connection.getresponse().read()
+            connection.close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("server did not start")
+
+
+def bench_endpoint(port, path, clients, requests):
+    """Throughput and latency of path with concurrent keep-alive clients"""
+    per_client = max(requests // clients, 1)
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+    barrier = threading.Barrier(clients + 1)
+
+    def client(index):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        barrier.wait()
+        for _ in range(per_client):
+            start = time.perf_counter()
+            try:
+                connection.request("GET", path)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors[index] += 1
+            except (OSError, http.client.HTTPException):
+                errors[index] += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            latencies[index].append(time.perf_counter() - start)
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    result = summarize([sample for samples in latencies for sample in samples])
+    result["requests_per_second"] = result["samples"] / elapsed
+    result["errors"] = sum(errors)
+    return result
+
+
+def bench_http(port, clients_list, requests):
+    """End-to-end HTTP benchmarks against a server process"""
+    results = {}
+    process = start_server(port)
+    try:
+        for path in ENDPOINTS:
+            bench_endpoint(port, path, 1, 20)  # warm up
+            for clients in clients_list:
+                key = f"http{path.rstrip('/')}.c{clients}"
+                results[key] = bench_endpoint(port, path, clients, requests)
+    finally:
+        process.terminate()
+        process.wait()
+    return results
+
+
+def git_revision():
+    """Current git commit, None if unavailable"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    """Print ratio of current to previous results (latency: lower is better)"""
+    print(f"\n{'benchmark':44} {'previous':>10} {'current':>10} {'ratio':>7}")
+    for key, result in results.items():
+        if key not in previous:
+            continue
+        metric = "requests_per_second" if "requests_per_second" in result else "p50_ms"
+        before, after = previous[key][metric], result[metric]
+        print(f"{key + ' ' + metric:44} {before:10.3f} {after:10.3f} {after / before:7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--repeat", type=int, default=200, help="calls per local benchmark")
+    parser.add_argument("--vehicles", type=int, default=24)
+    parser.add_argument("--clients", default="1,8,32", help="comma separated client counts")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint run")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--emulate", action="store_true",
+                        help="write new buffer versions (emulator) during HTTP benchmarks")
+    parser.add_argument("--skip-http", action="store_true")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", default=None, help="previous result file")
+    args = parser.parse_args()
+
+    data = populate_buffers(args.vehicles)
+    results = bench_local(data, args.repeat)
+    if not args.skip_http:
+        emulator = None
+        if args.emulate:
+            emulator = Emulator(vehicles=args.vehicles)
+            emulator.start()
+        try:
+            results.update(bench_http(
+                args.port, [int(clients) for clients in args.clients.split(",")], args.requests))
+        finally:
+            if emulator:
+                emulator.stop()
+
+    for key, result in results.items():
+        line = f"{key:40} p50 {result['p50_ms']:8.3f} ms  p99 {result['p99_ms']:8.3f} ms"
+        if "requests_per_second" in result:
+            line += f"  {result['requests_per_second']:8.0f} req/s  errors {result['errors']}"
+        print(line)
+
+    output = {
+        "meta": {
+            "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "arguments": vars(args),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(output, file, indent=2)
+    print(f"\nresults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(results, json.load(file)["results"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Version-keyed response cache
+
+The plugin increments mVersionUpdateEnd after every buffer write,
+so a response body built from one buffer version stays valid
+until that counter moves. Build the body once per version
+and serve the same bytes to every other request.
+
+The counter starts over when the writer restarts (rF2, emulator or
+replay), so a body is only reused for the same published snapshot
+object, not for an equal version of another one.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+# Returned by VersionCache.peek when body needs building,
+# builders may cache None (ex. vehicle not found)
+MISS = object()
+
+
+class VersionCache:
+    """Serialized response body cache keyed on buffer version
+
+    builder: callable(data, *args) returning the response body bytes
+    max_entries: maximum number of distinct builder argument sets kept
+    version: callable(data) returning the cache version of data,
+        default mVersionUpdateEnd
+    sources: callable(data) returning the structures body is built from,
+        default (data,), cached body is only valid for the same objects
+    """
+
+    def __init__(self, builder, max_entries=64, version=None, sources=None):
+        self._builder = builder
+        self._version = version
+        self._sources = sources
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, data, *args):
+        """Get response body for data
+
+        Extra args are passed to builder and are part of the cache key.
+        Body is rebuilt when mVersionUpdateEnd or the data object differs
+        from cached one.
+        """
+        version, sources = self.__key(data)
+        entry = self.__entry(args, version, sources)
+        if entry is not None:
+            self.hits += 1
+            return entry[2]
+
+        with self._lock:
+            # Another request may have built it while waiting for lock
+            entry = self.__entry(args, version, sources)
+            if entry is not None:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            body = self._builder(data, *args)
+            refs = tuple(weakref.ref(source) for source in sources)
+            self._entries[args] = (version, refs, body)
+            self._entries.move_to_end(args)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return body
+
+    def peek(self, data, *args):
+        """Get cached response body for data, MISS if it needs building
+
+        Never builds nor locks, to serve hits from the event loop.
+        """
+        entry = self.__entry(args, *self.__key(data))
+        if entry is not None:
+            self.hits += 1
+            return entry[2]
+        return MISS
+
+    def __key(self, data):
+        """Cache version and source objects of data"""
+        version = data.mVersionUpdateEnd if self._version is None else self._version(data)
+        sources = (data,) if self._sources is None else self._sources(data)
+        return version, sources
+
+    def __entry(self, args, version, sources):
+        """Cached entry of args built from the same version and objects, or None"""
+        entry = self._entries.get(args)
+        if entry is None or entry[0] != version:
+            return None
+        if any(ref() is not source for ref, source in zip(entry[1], sources)):
+            return None
+        return entry
+
+    def clear(self):
+        """Drop all cached bodies"""
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self):
+        """Cache hit/miss counters"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+        }
@@ -1,11 +1,25 @@
 from typing import Union
-from fastapi import FastAPI
-from rf2_data.sim_info_sync import SimInfoSync
+from fastapi import FastAPI, HTTPException, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from rf2_data.sim_info_sync import SimInfoSync, INVALID_INDEX
+import asyncio
+import ctypes
+import json
 import logging
+import os
 import threading
 from contextlib import asynccontextmanager
 import model
 import session
+import serializer
+import stream
+import metrics
+import profiling
+from cache import MISS, VersionCache
+from rf2_data import rf2_data as rF2data
+from rf2_data.buffers import snapshot_size
+from rf2_data.history import HistoryBuffer
 
 # Add logger
 logger = logging.getLogger(__name__)
@@ -15,40 +29,374 @@ logger.addHandler(test_handler)
 
 info = SimInfoSync(logger=__name__)
 
+# Record shared memory snapshots to this directory, if set
+RECORD_PATH = os.environ.get("RF2_RECORD")
+
+# Instrumentation, rendered by /metrics
+http_requests = metrics.Counter(
+    "rf2_http_requests_total", "HTTP requests by endpoint and status", ("endpoint", "status"))
+http_duration = metrics.Histogram(
+    "rf2_http_request_duration_seconds", "HTTP request duration by endpoint", ("endpoint",))
+serialize_duration = metrics.Histogram(
+    "rf2_serialize_seconds", "Response body build time (cache misses) by body", ("body",))
+
+def timed(builder, body):
+    """Observe builder duration in serialization histogram and profiling stage"""
+    return metrics.timed(
+        profiling.staged(builder, f"build.{body}"), serialize_duration.labels(body))
+
+scoring_cache = VersionCache(timed(
+    lambda data, padded, fields: serializer.projection(
+        rF2data.rF2Scoring, fields).dumps(data, padded), "scoring"))
+telemetry_cache = VersionCache(timed(
+    lambda data, padded, fields: serializer.projection(
+        rF2data.rF2Telemetry, fields).dumps(data, padded), "telemetry"))
+
+def vehicle_dumps(ctype, find_index):
+    """Response builder of a single vehicle, None if mID is not found"""
+    def dumps(data, mid, fields):
+        idx = find_index(mid, data)
+        if idx == INVALID_INDEX:
+            return None
+        return serializer.projection(ctype, fields).dumps(data.mVehicles[idx])
+    return dumps
+
+vehicle_scoring_cache = VersionCache(timed(
+    vehicle_dumps(rF2data.rF2VehicleScoring, info.findScorIndex), "vehicle_scoring"),
+    max_entries=256)
+vehicle_telemetry_cache = VersionCache(timed(
+    vehicle_dumps(rF2data.rF2VehicleTelemetry, info.findTeleIndex), "vehicle_telemetry"),
+    max_entries=256)
+
+def joined_vehicles_dumps(snapshot, scoring_fields, telemetry_fields):
+    """JSON array of scoring and telemetry of every active vehicle, joined by mID"""
+    dumps_scor = serializer.projection(rF2data.rF2VehicleScoring, scoring_fields).dumps
+    dumps_tele = serializer.projection(rF2data.rF2VehicleTelemetry, telemetry_fields).dumps
+    scor_vehicles = snapshot.scoring.mVehicles
+    tele_vehicles = snapshot.telemetry.mVehicles
+    records = [
+        b'{"mID":%d,"scoring":%s,"telemetry":%s}' % (
+            mid,
+            dumps_scor(scor_vehicles[idx_scor]),
+            b"null" if idx_tele == INVALID_INDEX else dumps_tele(tele_vehicles[idx_tele]))
+        for mid, idx_scor, idx_tele in snapshot.vehicles
+    ]
+    return b"[" + b",".join(records) + b"]"
+
+joined_vehicles_cache = VersionCache(
+    timed(joined_vehicles_dumps, "vehicles"),
+    version=lambda snapshot: (
+        snapshot.scoring.mVersionUpdateEnd, snapshot.telemetry.mVersionUpdateEnd),
+    sources=lambda snapshot: (snapshot.scoring, snapshot.telemetry))
+extended_cache = VersionCache(timed(serializer.Serializer(rF2data.rF2Extended).dumps, "extended"))
+ffb_cache = VersionCache(timed(serializer.Serializer(rF2data.rF2ForceFeedback).dumps, "ffb"))
+
+def raw_dumps(data, trim):
+    """Raw structure bytes, trim: only up to the last active vehicle slot"""
+    size = snapshot_size(data) if trim else ctypes.sizeof(data)
+    return ctypes.string_at(ctypes.addressof(data), size)
+
+raw_cache = {name: VersionCache(timed(raw_dumps, "raw")) for name in info.buffers}
+def session_dumps(data, active):
+    """Session JSON of scoring data"""
+    scoring = model.rF2Scoring.build(data)
+    with profiling.stage("session.construct"):
+        result = session.Session(scoring, active)
+    with profiling.stage("session.dumps"):
+        return result.model_dump_json().encode()
+
+session_cache = VersionCache(timed(session_dumps, "session"))
+
+def vehicles_body(vehicle_cache, data, vehicles):
+    """JSON array of vehicles found in data, ordered by mID"""
+    bodies = (vehicle_cache.get(data, mid, ()) for mid in sorted(vehicles))
+    return b"[" + b",".join(body for body in bodies if body is not None) + b"]"
+
+broadcaster = stream.Broadcaster({
+    "scoring": lambda data, vehicles: (
+        scoring_cache.get(data, False, ()) if vehicles is None
+        else vehicles_body(vehicle_scoring_cache, data, vehicles)),
+    "telemetry": lambda data, vehicles: (
+        telemetry_cache.get(data, False, ()) if vehicles is None
+        else vehicles_body(vehicle_telemetry_cache, data, vehicles)),
+    "extended": lambda data, vehicles: extended_cache.get(data),
+    "ffb": lambda data, vehicles: ffb_cache.get(data),
+    "session": lambda data, vehicles: session_cache.get(data, not info._paused),
+}, logger=__name__, source=info)
+
+def publish_update(name, data):
+    broadcaster.publish(name, data)
+    if name == "scoring":
+        broadcaster.publish("session", data)
+
+info.addListener(publish_update)
+
+# Vehicle history, memory: max_vehicles * (channels + 1) * capacity * 8 bytes
+HISTORY_VEHICLES = int(os.environ.get(
+    "RF2_HISTORY_VEHICLES", rF2data.rFactor2Constants.MAX_MAPPED_VEHICLES))
+history = {
+    "telemetry": HistoryBuffer(  # ~60 s at 50 Hz
+        "telemetry", max_vehicles=HISTORY_VEHICLES,
+        capacity=int(os.environ.get("RF2_HISTORY_TELEMETRY_SAMPLES", 3000))),
+    "scoring": HistoryBuffer(  # ~5 min at 5 Hz
+        "scoring", max_vehicles=HISTORY_VEHICLES,
+        capacity=int(os.environ.get("RF2_HISTORY_SCORING_SAMPLES", 1500))),
+}
+for _history in history.values():
+    info.addListener(_history.record)
+
+def json_response(body: bytes):
+    return Response(content=body, media_type="application/json")
+
+# In-flight body builds by (cache, data, args), awaited by concurrent misses
+_builds = {}
+
+async def cached_body(cache, data, *args):
+    """Response body from cache, built in threadpool only on cache miss
+
+    Hits never leave the event loop, builders never block it.
+    Concurrent misses of the same body wait for a single build.
+    """
+    body = cache.peek(data, *args)
+    if body is MISS:
+        key = (id(cache), id(data), args)  # data is referenced until build is done
+        build = _builds.get(key)
+        if build is None:
+            build = _builds[key] = asyncio.ensure_future(
+                run_in_threadpool(cache.get, data, *args))
+            build.add_done_callback(lambda _: _builds.pop(key, None))
+        body = await asyncio.shield(build)
+    return body
+
+def current_snapshot():
+    """Latest published buffer snapshot, one consistent generation per request"""
+    snapshot = info.snapshot
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="shared memory not available")
+    return snapshot
+
+def projection_fields(ctype, fields: Union[str, None]):
+    """Validate ?fields= query and return normalized projection key"""
+    if not fields:
+        return ()
+    key = serializer.normalize_fields(fields)
+    try:
+        serializer.projection(ctype, key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return key
+
 def run_rfactor2_sharedmemory_reader():
     info.setMode(0) # optional, can be omitted
     info.setPID("") # optional, can be omitted
     info.start()
+    if RECORD_PATH:
+        info.startRecording(RECORD_PATH)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     _worker_thread = threading.Thread(target=run_rfactor2_sharedmemory_reader, daemon=False)
     _worker_thread.start()
+    broadcaster.start(asyncio.get_running_loop())
     yield
+    info.stopRecording()
     info.stop()
+    broadcaster.stop()
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(metrics.RequestMetrics, requests=http_requests, durations=http_duration)
+app.add_middleware(profiling.ServerTiming)
 
 @app.get("/")
-def root():
+async def root():
     return {}
 
 @app.get("/healthz")
-def healthz():
+async def healthz():
     return {"alive": True}
 
 @app.get("/scoring/")
-def read_scoring():
-    return model.rF2Scoring.build(info.rf2Scor)
+async def read_scoring(padded: bool = False, fields: Union[str, None] = None):
+    key = projection_fields(rF2data.rF2Scoring, fields)
+    return json_response(await cached_body(scoring_cache, current_snapshot().scoring, padded, key))
 
 @app.get("/telemetry/")
-def read_telemetry():
-    return model.rF2Telemetry.build(info.rf2Tele)
+async def read_telemetry(padded: bool = False, fields: Union[str, None] = None):
+    key = projection_fields(rF2data.rF2Telemetry, fields)
+    return json_response(
+        await cached_body(telemetry_cache, current_snapshot().telemetry, padded, key))
+
+@app.get("/vehicles/")
+async def read_vehicles(scoring_fields: Union[str, None] = None,
+                        telemetry_fields: Union[str, None] = None):
+    scoring_key = projection_fields(rF2data.rF2VehicleScoring, scoring_fields)
+    telemetry_key = projection_fields(rF2data.rF2VehicleTelemetry, telemetry_fields)
+    snapshot = current_snapshot()
+    if snapshot.scoring is None or snapshot.telemetry is None:
+        raise HTTPException(status_code=503, detail="shared memory not available")
+    return json_response(
+        await cached_body(joined_vehicles_cache, snapshot, scoring_key, telemetry_key))
+
+@app.get("/vehicles/{mID}/scoring")
+async def read_vehicle_scoring(mID: int, fields: Union[str, None] = None):
+    key = projection_fields(rF2data.rF2VehicleScoring, fields)
+    body = await cached_body(vehicle_scoring_cache, current_snapshot().scoring, mID, key)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"vehicle not found: {mID}")
+    return json_response(body)
+
+@app.get("/vehicles/{mID}/telemetry")
+async def read_vehicle_telemetry(mID: int, fields: Union[str, None] = None):
+    key = projection_fields(rF2data.rF2VehicleTelemetry, fields)
+    body = await cached_body(vehicle_telemetry_cache, current_snapshot().telemetry, mID, key)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"vehicle not found: {mID}")
+    return json_response(body)
+
+@app.websocket("/ws/")
+async def websocket_stream(websocket: WebSocket):
+    await websocket.accept()
+    subscriber = None
+    sender = None
+    try:
+        while True:
+            message = await websocket.receive_text()
+            if sender:
+                sender.cancel()
+                broadcaster.unsubscribe(subscriber)
+                sender = subscriber = None
+            try:
+                buffers, vehicles = stream.parse_request(json.loads(message))
+                subscriber = broadcaster.subscribe(buffers, vehicles)
+            except ValueError as e:
+                await websocket.send_json({"error": str(e)})
+                continue
+            sender = asyncio.create_task(stream.send_frames(websocket, subscriber))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if sender:
+            sender.cancel()
+            broadcaster.unsubscribe(subscriber)
+
+@app.get("/raw/{buffer}")
+async def read_raw(buffer: str, trim: bool = False):
+    if buffer not in raw_cache:
+        raise HTTPException(status_code=404, detail=f"unknown buffer: {buffer}")
+    info.touchBuffer(buffer)
+    data = getattr(current_snapshot(), buffer)
+    if data is None:
+        raise HTTPException(status_code=503, detail=f"buffer not available: {buffer}")
+    version = data.mVersionUpdateEnd
+    return Response(
+        content=await cached_body(raw_cache[buffer], data, trim),
+        media_type="application/octet-stream",
+        headers={
+            "X-rF2-Version": str(version),
+            "X-rF2-Struct-Size": str(ctypes.sizeof(data)),
+        },
+    )
+
+@app.get("/history/{buffer}")
+def read_history(buffer: str,
+                 vehicles: Union[str, None] = None,
+                 channels: Union[str, None] = None,
+                 seconds: Union[float, None] = None):
+    if buffer not in history:
+        raise HTTPException(status_code=404, detail=f"unknown buffer: {buffer}")
+    try:
+        mids = None if vehicles is None else [int(mid) for mid in vehicles.split(",")]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="vehicles must be comma separated mIDs")
+    names = None if channels is None else [name.strip() for name in channels.split(",")]
+    try:
+        result = history[buffer].query(mids, names, seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "channels": names or history[buffer].channels,
+        "vehicles": result,
+    }
 
 @app.get("/running/")
-def running():
-    return { "active": not info._paused }
+async def running():
+    snapshot = info.snapshot
+    return { "active": snapshot is not None and snapshot.active }
 
 @app.get("/session/")
-def read_session():
-    return session.Session(model.rF2Scoring.build(info.rf2Scor), not info._paused)
\ No newline at end of file
+async def read_session():
+    snapshot = current_snapshot()
+    return json_response(await cached_body(session_cache, snapshot.scoring, snapshot.active))
+
+@app.get("/session/stream")
+async def stream_session(max_rate: float = 5.0):
+    if max_rate <= 0:
+        raise HTTPException(status_code=400, detail="max_rate must be positive")
+    subscriber = broadcaster.subscribe(
+        ["session"], queue_size=1, frame_format=stream.sse_event)
+    return StreamingResponse(
+        stream.sse_events(broadcaster, subscriber, max_rate),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/buffers/")
+def read_buffers():
+    return info.subscriptions
+
+@app.get("/reader/")
+def read_reader():
+    return {name: mmap_info.stats for name, mmap_info in info.buffers.items()}
+
+@app.get("/scheduler/")
+def read_scheduler():
+    return info.scheduler.stats
+
+@app.get("/recording/")
+def read_recording():
+    if info.recorder is None:
+        return {"recording": False}
+    return info.recorder.stats
+
+@app.get("/cache/")
+def read_cache():
+    return {
+        "scoring": scoring_cache.stats,
+        "telemetry": telemetry_cache.stats,
+        "session": session_cache.stats,
+        "vehicle_scoring": vehicle_scoring_cache.stats,
+        "vehicle_telemetry": vehicle_telemetry_cache.stats,
+        "vehicles": joined_vehicles_cache.stats,
+        "extended": extended_cache.stats,
+        "ffb": ffb_cache.stats,
+        "stream": broadcaster.stats,
+        "raw": {name: cache.stats for name, cache in raw_cache.items()},
+    }
+
+@app.get("/metrics")
+def read_metrics():
+    families = metrics.reader_metrics(info)
+    families += [http_requests.render(), http_duration.render(), serialize_duration.render()]
+    return Response(content="\n".join(families) + "\n", media_type=metrics.CONTENT_TYPE)
+
+@app.get("/profile/")
+def read_profile():
+    return profiling.profiler.stats
+
+@app.post("/profile/")
+def set_profile(enabled: bool = True):
+    profiling.profiler.enabled = enabled
+    profiling.profiler.reset()
+    return profiling.profiler.stats
+
+@app.get("/profile/sample")
+def sample_profile(seconds: float = 5.0, interval: float = 0.005):
+    if not 0 < seconds <= 60:
+        raise HTTPException(status_code=400, detail="seconds must be 0 - 60")
+    if not 0.001 <= interval <= 1:
+        raise HTTPException(status_code=400, detail="interval must be 0.001 - 1")
+    try:
+        samples = profiling.sample_stacks(seconds, interval)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return Response(content=profiling.folded(samples), media_type="text/plain")
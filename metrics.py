@@ -0,0 +1,213 @@
+"""
+Prometheus metrics
+
+Counters and histograms rendered in the Prometheus text exposition format,
+without a client library dependency. Recording a sample is a few integer
+and float additions, cheap enough to stay enabled on every request.
+Shared memory reader counters are not recorded here, they are collected
+from SimInfoSync when /metrics is scraped.
+"""
+import bisect
+import time
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds, request and serialization latency
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def format_labels(labels):
+    """Label set text, empty if no labels"""
+    if not labels:
+        return ""
+    text = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items())
+    return "{" + text + "}"
+
+
+def format_value(value):
+    """Sample value text"""
+    if value is None:
+        return "NaN"
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_family(name, kind, help_text, samples):
+    """Text of a metric family
+
+    samples: (labels dict, value) pairs, or (suffix, labels dict, value)
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for sample in samples:
+        suffix, labels, value = sample if len(sample) == 3 else ("", *sample)
+        lines.append(f"{name}{suffix}{format_labels(labels)} {format_value(value)}")
+    return "\n".join(lines)
+
+
+class Counter:
+    """Monotonic counter by label values"""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        """Add amount to counter of label values"""
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        """Text of metric family"""
+        return render_family(self.name, "counter", self.help_text, [
+            (dict(zip(self.label_names, values)), value)
+            for values, value in list(self._values.items())
+        ])
+
+
+class _HistogramChild:
+    """Histogram of one label value set"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last: above highest bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Add sample"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram:
+    """Cumulative bucket histogram by label values
+
+    buckets: ascending upper bounds, +Inf is added
+    """
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._children = {}
+
+    def labels(self, *label_values):
+        """Histogram of label values, observe() samples on it"""
+        child = self._children.get(label_values)
+        if child is None:
+            child = self._children.setdefault(label_values, _HistogramChild(self.buckets))
+        return child
+
+    def observe(self, value, *label_values):
+        """Add sample to histogram of label values"""
+        self.labels(*label_values).observe(value)
+
+    def render(self):
+        """Text of metric family"""
+        samples = []
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.label_names, values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": format_value(float(bound))}, cumulative))
+            samples.append(("_sum", labels, child.sum))
+            samples.append(("_count", labels, child.count))
+        return render_family(self.name, "histogram", self.help_text, samples)
+
+
+def timed(builder, histogram):
+    """Wrap builder to observe its duration (seconds) in histogram child"""
+    def timed_builder(*args):
+        start = time.perf_counter()
+        try:
+            return builder(*args)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return timed_builder
+
+
+class RequestMetrics:
+    """ASGI middleware counting HTTP requests and their duration by endpoint
+
+    Endpoint label is the name of the matched route handler,
+    "none" if no route matched.
+    """
+
+    def __init__(self, app, requests, durations):
+        self.app = app
+        self.requests = requests
+        self.durations = durations
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            endpoint = scope.get("endpoint")
+            name = getattr(endpoint, "__name__", "none")
+            self.requests.inc(name, status[0])
+            self.durations.observe(time.perf_counter() - start, name)
+
+
+def reader_metrics(info):
+    """Text of shared memory reader metric families of a SimInfoSync"""
+    reader = info.stats
+    mmaps = {name: mmap_info.stats for name, mmap_info in info.buffers.items()}
+    rates = info.scheduler.stats["buffers"]
+    families = [
+        render_family(
+            "rf2_poll_loop_seconds", "summary",
+            "Shared memory updating loop iteration time, excluding sleep",
+            [("_sum", {}, reader["loop_seconds"]), ("_count", {}, reader["loops"])]),
+        render_family(
+            "rf2_state_transitions_total", "counter",
+            "Pause and unpause transitions of the updating loop",
+            [({"transition": name}, count) for name, count in reader["transitions"].items()]),
+        render_family(
+            "rf2_active", "gauge", "Player data active (not paused)",
+            [({}, int(reader["active"]))]),
+    ]
+    for metric, kind, key, help_text in (
+            ("rf2_buffer_copies_total", "counter", "copies", "Accepted shared memory copies"),
+            ("rf2_buffer_copy_skipped_total", "counter", "skipped",
+             "Copies skipped, version unchanged"),
+            ("rf2_buffer_torn_reads_total", "counter", "torn_reads",
+             "Copies rejected, buffer written during copy"),
+            ("rf2_buffer_stale_reads_total", "counter", "stale_reads",
+             "Updates keeping previous data after all retries"),
+            ("rf2_buffer_copy_seconds_total", "counter", "copy_seconds",
+             "Time spent copying shared memory"),
+            ("rf2_buffer_copy_bytes_total", "counter", "copy_bytes",
+             "Bytes copied from shared memory, including retries")):
+        families.append(render_family(metric, kind, help_text, [
+            ({"buffer": name}, stats[key]) for name, stats in mmaps.items()]))
+    for metric, kind, key, help_text in (
+            ("rf2_buffer_updates_total", "counter", "updates", "New buffer versions read"),
+            ("rf2_buffer_reads_total", "counter", "reads", "Buffer reads"),
+            ("rf2_buffer_update_rate_hz", "gauge", "rate_hz", "Observed buffer write rate"),
+            ("rf2_buffer_age_seconds", "gauge", "age_seconds",
+             "Seconds since last buffer version change")):
+        families.append(render_family(metric, kind, help_text, [
+            ({"buffer": name}, stats[key]) for name, stats in rates.items()]))
+    return families
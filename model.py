@@ -5,6 +5,7 @@ from typing import Optional
 from ctypes import Array, Structure, Union, _Pointer, _SimpleCData
 from json import JSONEncoder
 import json
+import profiling
 
 def Cbytestring2Python(bytestring):
     """
@@ -64,6 +65,15 @@ class CDataJSONEncoder(JSONEncoder):
 
         return JSONEncoder.default(self, obj)
     
+def build_model(model, a):
+    """Validate ctypes data as model, each stage timed while profiling"""
+    with profiling.stage("model.encode"):
+        data = CDataJSONEncoder().default(a)
+    with profiling.stage("model.dumps"):
+        text = json.dumps(data)
+    with profiling.stage("model.validate"):
+        return model.model_validate_json(text, strict=True)
+
 class rF2GamePhase(Enum):
         Garage = 0
         WarmUp = 1
@@ -407,7 +417,7 @@ class rF2Scoring(BaseModel):
 
     @classmethod
     def build(cls, a: Any):
-        return rF2Scoring.model_validate_json(json.dumps(a, cls=CDataJSONEncoder), strict=True)
+        return build_model(rF2Scoring, a)
 
 class rF2Telemetry(BaseModel):
     mVersionUpdateBegin: int # Incremented right before the buffer is written to
@@ -418,4 +428,4 @@ class rF2Telemetry(BaseModel):
 
     @classmethod
     def build(cls, a: Any):
-        return rF2Telemetry.model_validate_json(json.dumps(a, cls=CDataJSONEncoder), strict=True)
+        return build_model(rF2Telemetry, a)
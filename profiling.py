@@ -0,0 +1,200 @@
+"""
+Opt-in response profiling
+
+Time the stages of building a response body (CDataJSONEncoder walk,
+json.dumps, pydantic validation, Session construction, serialization),
+aggregate them per stage, and report the stages of each request in a
+Server-Timing header. Disabled stages cost one attribute check.
+
+Enable with RF2_PROFILE=1 or POST /profile/?enabled=true.
+
+Also capture a sampling profile of all threads of the running process
+for a fixed duration, as folded stacks (flamegraph.pl, speedscope).
+"""
+import contextlib
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Stage timings of the current request, set by ServerTiming middleware
+_request_stages = contextvars.ContextVar("request_stages", default=None)
+
+_DISABLED = contextlib.nullcontext()
+
+
+class _Stage:
+    """Context manager timing a stage"""
+
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profiler.record(self._name, time.perf_counter() - self._start)
+
+
+class StageProfiler:
+    """Aggregated durations of named stages
+
+    enabled: time stages, otherwise stage() is a no-op
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._stages = {}  # name -> [count, total seconds, max seconds]
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """Context manager timing stage name, if enabled"""
+        if not self.enabled:
+            return _DISABLED
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        """Add stage duration to aggregate and current request"""
+        with self._lock:
+            entry = self._stages.get(name)
+            if entry is None:
+                self._stages[name] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                if seconds > entry[2]:
+                    entry[2] = seconds
+        stages = _request_stages.get()
+        if stages is not None:
+            stages.append((name, seconds))
+
+    def reset(self):
+        """Drop aggregated timings"""
+        with self._lock:
+            self._stages.clear()
+
+    @property
+    def stats(self):
+        """Aggregated timings by stage (milliseconds)"""
+        with self._lock:
+            stages = {name: list(entry) for name, entry in self._stages.items()}
+        return {
+            "enabled": self.enabled,
+            "stages": {
+                name: {
+                    "count": count,
+                    "total_ms": total * 1000,
+                    "mean_ms": total / count * 1000,
+                    "max_ms": maximum * 1000,
+                }
+                for name, (count, total, maximum) in sorted(stages.items())
+            },
+        }
+
+
+profiler = StageProfiler(enabled=os.environ.get("RF2_PROFILE", "") not in ("", "0"))
+
+
+def stage(name):
+    """Context manager timing stage name with the process profiler"""
+    return profiler.stage(name)
+
+
+def staged(builder, name):
+    """Wrap builder to time it as stage name"""
+    def staged_builder(*args):
+        if not profiler.enabled:
+            return builder(*args)
+        with _Stage(profiler, name):
+            return builder(*args)
+    return staged_builder
+
+
+def server_timing(stages, total):
+    """Server-Timing header value of (name, seconds) stages and total"""
+    entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in stages]
+    entries.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(entries)
+
+
+class ServerTiming:
+    """ASGI middleware adding a Server-Timing header while profiling is enabled
+
+    Stages recorded while handling the request are listed in order,
+    total is the time until response headers were sent. The gap between
+    total and stages is routing, validation and response encoding.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.enabled:
+            return await self.app(scope, receive, send)
+        stages = []
+        token = _request_stages.set(stages)
+        start = time.perf_counter()
+
+        async def send_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    server_timing(stages, time.perf_counter() - start).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timing)
+        finally:
+            _request_stages.reset(token)
+
+
+_capture_lock = threading.Lock()
+
+
+def frame_name(code):
+    """Folded stack frame name: file:function"""
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def sample_stacks(seconds, interval=0.005):
+    """Sample stacks of all other threads for seconds
+
+    Returns {folded stack: samples}, stacks are thread name followed by
+    frames from outermost to innermost, separated by ";".
+    Raises RuntimeError if a capture is already running.
+    """
+    if not _capture_lock.acquire(blocking=False):
+        raise RuntimeError("profile capture already running")
+    try:
+        current = threading.get_ident()
+        samples = Counter()
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == current:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_name(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                samples[";".join(reversed(stack))] += 1
+            time.sleep(interval)
+        return samples
+    finally:
+        _capture_lock.release()
+
+
+def folded(samples):
+    """Folded stacks text, most sampled first"""
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
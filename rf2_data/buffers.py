@@ -0,0 +1,56 @@
+"""
+rF2 shared memory buffers
+
+Data class and mapping name of each buffer by buffer name,
+and active vehicle slots of buffers holding a mVehicles array.
+"""
+import ctypes
+
+try:
+    from . import rf2_data as rF2data
+except ImportError:  # standalone, not package
+    import rf2_data as rF2data
+
+MAX_VEHICLES = rF2data.rFactor2Constants.MAX_MAPPED_VEHICLES
+
+# Data class by buffer name
+BUFFER_TYPES = {
+    "scoring": rF2data.rF2Scoring,
+    "telemetry": rF2data.rF2Telemetry,
+    "extended": rF2data.rF2Extended,
+    "ffb": rF2data.rF2ForceFeedback,
+}
+
+# Shared memory mapping name by buffer name
+MMAP_NAMES = {
+    "scoring": "$rFactor2SMMP_Scoring$",
+    "telemetry": "$rFactor2SMMP_Telemetry$",
+    "extended": "$rFactor2SMMP_Extended$",
+    "ffb": "$rFactor2SMMP_ForceFeedback$",
+}
+
+# Active vehicle count by data class of buffers holding a mVehicles array
+VEHICLE_COUNTS = {
+    rF2data.rF2Scoring: lambda data: data.mScoringInfo.mNumVehicles,
+    rF2data.rF2Telemetry: lambda data: data.mNumVehicles,
+}
+
+
+def vehicle_count(data):
+    """Active vehicle slots of buffer data, clamped to mapped range
+
+    None if buffer has no vehicle array.
+    """
+    num_vehicles = VEHICLE_COUNTS.get(type(data))
+    if num_vehicles is None:
+        return None
+    return min(max(num_vehicles(data), 0), MAX_VEHICLES)
+
+
+def snapshot_size(data):
+    """Structure size up to last active vehicle slot (full size if no vehicles)"""
+    count = vehicle_count(data)
+    if count is None:
+        return ctypes.sizeof(data)
+    vehicles = type(data).mVehicles
+    return vehicles.offset + count * (vehicles.size // MAX_VEHICLES)
@@ -0,0 +1,276 @@
+"""
+rF2 shared memory plugin emulator
+
+Write synthetic scoring, telemetry, extended and force feedback data into the rF2
+shared memory mappings at configurable rates and vehicle counts,
+to load test the API without rF2. Vehicles drive around a circular
+track with varying speed, positions and lap counts are consistent
+between scoring and telemetry.
+
+Writes follow the plugin protocol (mVersionUpdateBegin, data,
+mVersionUpdateEnd). Slow writes keep the buffer in a torn state for a
+while, to exercise readers' version check.
+
+Run from repository root:
+
+    python -m rf2_data.emulator [--vehicles 128] [--telemetry-rate 100] [--scoring-rate 5]
+"""
+import argparse
+import ctypes
+import logging
+import math
+import threading
+import time
+
+try:
+    from . import rf2_data as rF2data
+    from .buffers import snapshot_size
+    from .replay import SharedMemoryWriter
+except ImportError:  # standalone, not package
+    import rf2_data as rF2data
+    from buffers import snapshot_size
+    from replay import SharedMemoryWriter
+
+MAX_VEHICLES = rF2data.rFactor2Constants.MAX_MAPPED_VEHICLES
+TRACK_LENGTH = 5000.0  # meters
+TRACK_RADIUS = TRACK_LENGTH / (2 * math.pi)
+SPEED_VARIATION = 12.0  # m/s
+SPEED_PERIOD = 20.0  # seconds
+
+
+class Emulator:
+    """Synthetic shared memory writer thread
+
+    vehicles: number of active vehicles (1 - 128)
+    rates: updates per second by buffer name, 0 to not write a buffer
+    slow_write_delay: seconds between begin and end version of a slow write
+    slow_write_every: every n-th write is slow, 0 to disable
+    """
+
+    def __init__(self, vehicles=24, rates=None, slow_write_delay=0.0, slow_write_every=0,
+                 writer=None, logger=__name__):
+        if not 1 <= vehicles <= MAX_VEHICLES:
+            raise ValueError(f"vehicles must be 1 - {MAX_VEHICLES}")
+        self._logger = logging.getLogger(logger)
+        self.num_vehicles = vehicles
+        self.rates = {"telemetry": 100.0, "scoring": 5.0, "extended": 1.0, "ffb": 0.0}
+        self.rates.update(rates or {})
+        self.slow_write_delay = slow_write_delay
+        self.slow_write_every = slow_write_every
+        self._writer = writer or SharedMemoryWriter(
+            buffers=[name for name, rate in self.rates.items() if rate > 0], logger=logger)
+        self._data = {
+            "scoring": rF2data.rF2Scoring(),
+            "telemetry": rF2data.rF2Telemetry(),
+            "extended": rF2data.rF2Extended(),
+            "ffb": rF2data.rF2ForceFeedback(),
+        }
+        self._updates = {
+            "scoring": self.__update_scoring,
+            "telemetry": self.__update_telemetry,
+            "extended": self.__update_extended,
+            "ffb": self.__update_ffb,
+        }
+        self._running = False
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._start_time = 0.0
+        self.writes = {name: 0 for name in self._data}
+        self.slow_writes = 0
+        self.__init_data()
+
+    def start(self):
+        """Start writing thread"""
+        if self._running:
+            return None
+        self._running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.__run, daemon=True)
+        self._thread.start()
+        self._logger.info(
+            "emulator - started, %s vehicles, rates %s", self.num_vehicles, self.rates)
+
+    def stop(self):
+        """Stop writing thread"""
+        self._running = False
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        self._logger.info("emulator - stopped, writes %s, slow %s", self.writes, self.slow_writes)
+
+    @property
+    def stats(self):
+        """Write counters"""
+        return {"writes": dict(self.writes), "slow_writes": self.slow_writes}
+
+    def __init_data(self):
+        """Set static fields"""
+        scoring = self._data["scoring"]
+        info = scoring.mScoringInfo
+        info.mTrackName = b"Emulator Oval"
+        info.mSession = 10  # race
+        info.mGamePhase = 5  # green flag
+        info.mEndET = 3600.0
+        info.mMaxLaps = 100
+        info.mLapDist = TRACK_LENGTH
+        info.mNumVehicles = self.num_vehicles
+        info.mInRealtime = True
+        info.mPlayerName = b"Player"
+        telemetry = self._data["telemetry"]
+        telemetry.mNumVehicles = self.num_vehicles
+        for idx in range(self.num_vehicles):
+            veh_scor = scoring.mVehicles[idx]
+            veh_scor.mID = idx
+            veh_scor.mDriverName = f"Driver {idx + 1}".encode()
+            veh_scor.mVehicleName = f"Car #{idx + 1}".encode()
+            veh_scor.mVehicleClass = b"GT3"
+            veh_scor.mIsPlayer = idx == 0
+            veh_scor.mControl = 0 if idx == 0 else 1
+            veh_tele = telemetry.mVehicles[idx]
+            veh_tele.mID = idx
+            veh_tele.mVehicleName = veh_scor.mVehicleName
+            veh_tele.mTrackName = info.mTrackName
+            veh_tele.mEngineMaxRPM = 9000.0
+        extended = self._data["extended"]
+        extended.mVersion = b"3.7.15.1"
+        extended.is64bit = True
+        extended.mSessionStarted = True
+        extended.mInRealtimeFC = True
+
+    def __vehicle_state(self, idx, elapsed):
+        """Distance traveled (m) and speed (m/s) of vehicle at elapsed time"""
+        base = 45.0 + (idx % 16) * 0.4
+        omega = 2 * math.pi / SPEED_PERIOD
+        phase = idx * 0.7
+        speed = base + SPEED_VARIATION * math.sin(omega * elapsed + phase)
+        distance = (
+            -idx * 20.0  # grid position
+            + base * elapsed
+            - SPEED_VARIATION / omega * (math.cos(omega * elapsed + phase) - math.cos(phase)))
+        return distance, speed
+
+    @staticmethod
+    def __track_position(distance, target):
+        """Set mPos of target from track distance"""
+        angle = distance / TRACK_RADIUS
+        target.x = TRACK_RADIUS * math.cos(angle)
+        target.y = 0.0
+        target.z = TRACK_RADIUS * math.sin(angle)
+
+    def __update_scoring(self, elapsed):
+        """Update scoring: lap distance, laps, places and gaps"""
+        scoring = self._data["scoring"]
+        scoring.mScoringInfo.mCurrentET = elapsed
+        states = [self.__vehicle_state(idx, elapsed) for idx in range(self.num_vehicles)]
+        order = sorted(range(self.num_vehicles), key=lambda idx: -states[idx][0])
+        leader_distance = states[order[0]][0]
+        for place, idx in enumerate(order, 1):
+            distance, speed = states[idx]
+            veh = scoring.mVehicles[idx]
+            veh.mPlace = place
+            veh.mTotalLaps = max(int(distance // TRACK_LENGTH), 0)
+            veh.mLapDist = distance % TRACK_LENGTH
+            veh.mLocalVel.z = -speed
+            veh.mTimeIntoLap = veh.mLapDist / speed
+            veh.mEstimatedLapTime = TRACK_LENGTH / speed
+            ahead = states[order[place - 2]][0] if place > 1 else distance
+            veh.mTimeBehindNext = (ahead - distance) / speed
+            veh.mTimeBehindLeader = (leader_distance - distance) / speed
+            self.__track_position(distance, veh.mPos)
+
+    def __update_telemetry(self, elapsed):
+        """Update telemetry: inputs, engine and motion of every vehicle"""
+        telemetry = self._data["telemetry"]
+        for idx in range(self.num_vehicles):
+            distance, speed = self.__vehicle_state(idx, elapsed)
+            accel = math.cos(2 * math.pi / SPEED_PERIOD * elapsed + idx * 0.7)
+            veh = telemetry.mVehicles[idx]
+            veh.mDeltaTime = elapsed - veh.mElapsedTime
+            veh.mElapsedTime = elapsed
+            veh.mLapNumber = max(int(distance // TRACK_LENGTH), 0) + 1
+            veh.mGear = min(int(speed // 12) + 1, 6)
+            veh.mEngineRPM = 4000.0 + 5000.0 * (speed % 12) / 12
+            veh.mUnfilteredThrottle = max(accel, 0.0)
+            veh.mUnfilteredBrake = max(-accel, 0.0)
+            veh.mUnfilteredSteering = 0.1
+            veh.mFuel = max(100.0 - distance / 2000.0, 0.0)
+            veh.mLocalVel.z = -speed
+            self.__track_position(distance, veh.mPos)
+
+    def __update_extended(self, elapsed):
+        """Update extended: session ticks"""
+        self._data["extended"].mTicksSessionStarted = int(self._start_time * 1e7)
+
+    def __update_ffb(self, elapsed):
+        """Update force feedback: steering force of player vehicle"""
+        self._data["ffb"].mForceValue = 0.3 * math.sin(2 * math.pi * 2 * elapsed)
+
+    def __write(self, name, elapsed):
+        """Update and write a buffer with next version"""
+        data = self._data[name]
+        self._updates[name](elapsed)
+        version = data.mVersionUpdateEnd + 1
+        data.mVersionUpdateBegin = data.mVersionUpdateEnd = version
+        self.writes[name] += 1
+        delay = 0.0
+        if self.slow_write_every and self.writes[name] % self.slow_write_every == 0:
+            delay = self.slow_write_delay
+            self.slow_writes += 1
+        payload = ctypes.string_at(ctypes.addressof(data), snapshot_size(data))
+        self._writer.write(name, version, payload, delay)
+
+    def __run(self):
+        """Writing thread"""
+        self._start_time = time.monotonic()
+        due = {name: self._start_time for name, rate in self.rates.items() if rate > 0}
+        while self._running:
+            name = min(due, key=due.get)
+            delay = due[name] - time.monotonic()
+            if delay > 0 and self._stop_event.wait(delay):
+                break
+            now = time.monotonic()
+            self.__write(name, now - self._start_time)
+            # Skip missed updates instead of bursting when behind
+            due[name] = max(due[name] + 1 / self.rates[name], now)
+
+
+def main():
+    """Run emulator from command line"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--vehicles", type=int, default=24)
+    parser.add_argument("--telemetry-rate", type=float, default=100.0)
+    parser.add_argument("--scoring-rate", type=float, default=5.0)
+    parser.add_argument("--extended-rate", type=float, default=1.0)
+    parser.add_argument("--ffb-rate", type=float, default=0.0)
+    parser.add_argument("--slow-write-delay", type=float, default=0.0,
+                        help="seconds a slow write stays torn")
+    parser.add_argument("--slow-write-every", type=int, default=0,
+                        help="make every n-th write slow, 0 to disable")
+    parser.add_argument("--duration", type=float, default=None, help="seconds, default forever")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    emulator = Emulator(
+        vehicles=args.vehicles,
+        rates={
+            "telemetry": args.telemetry_rate,
+            "scoring": args.scoring_rate,
+            "extended": args.extended_rate,
+            "ffb": args.ffb_rate,
+        },
+        slow_write_delay=args.slow_write_delay,
+        slow_write_every=args.slow_write_every,
+    )
+    emulator.start()
+    try:
+        if args.duration:
+            time.sleep(args.duration)
+        else:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    emulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+In-memory vehicle history
+
+Fixed-size columnar ring buffers of selected vehicle channels,
+appended once per new scoring or telemetry version by SimInfoSync listener.
+All storage is preallocated, memory use is
+max_vehicles * (channels + 1) * capacity * 8 bytes.
+"""
+import bisect
+import ctypes
+import struct
+import threading
+from array import array
+
+try:
+    from . import rf2_data as rF2data
+    from .buffers import BUFFER_TYPES, vehicle_count
+except ImportError:  # standalone, not package
+    import rf2_data as rF2data
+    from buffers import BUFFER_TYPES, vehicle_count
+
+# Buffer: (buffer sample time, vehicle sample time)
+HISTORY_BUFFERS = {
+    "scoring": (
+        lambda data: data.mScoringInfo.mCurrentET,
+        None,
+    ),
+    "telemetry": (
+        None,
+        "mElapsedTime",
+    ),
+}
+
+DEFAULT_CHANNELS = {
+    "scoring": ("mLapDist", "mPlace", "mTotalLaps", "mTimeBehindNext"),
+    "telemetry": (
+        "mUnfilteredThrottle", "mUnfilteredBrake", "mUnfilteredSteering",
+        "mEngineRPM", "mGear", "mLocalVel.z",
+    ),
+}
+
+_STRUCT_CODES = {
+    ctypes.c_double: "d", ctypes.c_float: "f", ctypes.c_bool: "?",
+    ctypes.c_byte: "b", ctypes.c_ubyte: "B", ctypes.c_short: "h",
+    ctypes.c_ushort: "H", ctypes.c_int: "i", ctypes.c_uint: "I",
+    ctypes.c_longlong: "q", ctypes.c_ulonglong: "Q",
+}
+
+
+def channel_layout(ctype, path):
+    """Byte offset and struct code of a numeric channel
+
+    path: dotted field path in ctype, ex. mLocalVel.z
+    Raises ValueError if path is not a numeric scalar field.
+    """
+    offset = 0
+    for name in path.split("."):
+        if not (isinstance(ctype, type) and issubclass(ctype, ctypes.Structure)):
+            raise ValueError(f"unknown channel: {path}")
+        field_types = {field[0]: field[1] for field in ctype._fields_}
+        if name not in field_types:
+            raise ValueError(f"unknown channel: {path}")
+        offset += getattr(ctype, name).offset
+        ctype = field_types[name]
+    if ctype not in _STRUCT_CODES:
+        raise ValueError(f"channel is not numeric: {path}")
+    return offset, _STRUCT_CODES[ctype]
+
+
+class HistoryBuffer:
+    """Ring buffer history of vehicle channels
+
+    buffer: "scoring" or "telemetry"
+    channels: vehicle field paths to record, ex. ("mEngineRPM", "mLocalVel.z")
+    capacity: samples kept per vehicle
+    max_vehicles: vehicles kept, least recently updated one is replaced,
+        vehicles beyond max_vehicles in a single version are not recorded
+    """
+
+    def __init__(self, buffer, channels=None, capacity=3000,
+                 max_vehicles=rF2data.rFactor2Constants.MAX_MAPPED_VEHICLES):
+        self._buffer_time, vehicle_time = HISTORY_BUFFERS[buffer]
+        rf2_data = BUFFER_TYPES[buffer]
+        vehicle_class = {field[0]: field[1] for field in rf2_data._fields_}["mVehicles"]._type_
+        self.buffer = buffer
+        self.channels = tuple(channels or DEFAULT_CHANNELS[buffer])
+        self.capacity = capacity
+        self.max_vehicles = max_vehicles
+        self._vehicles_offset = rf2_data.mVehicles.offset
+        self._vehicle_size = ctypes.sizeof(vehicle_class)
+
+        # Unpack mID, (vehicle time), channels of a vehicle in one call
+        fields = ["mID"] + ([vehicle_time] if vehicle_time else []) + list(self.channels)
+        layout = sorted(
+            (channel_layout(vehicle_class, path) + (index,))
+            for index, path in enumerate(fields))
+        fmt, position = "<", 0
+        for offset, code, _ in layout:
+            fmt += f"{offset - position}x{code}" if offset > position else code
+            position = offset + struct.calcsize("<" + code)
+        self._unpack = struct.Struct(fmt).unpack_from
+        # Order of unpacked values -> order of fields
+        self._order = [index for _, _, index in layout]
+        self._vehicle_time = vehicle_time is not None
+
+        # Preallocated columns: time + channels, per vehicle row
+        width = len(self.channels) + 1
+        self._columns = [
+            [array("d", bytes(8 * capacity)) for _ in range(width)]
+            for _ in range(max_vehicles)
+        ]
+        self._rows = {}  # mID -> row
+        self._row_mid = [None] * max_vehicles
+        self._head = [0] * max_vehicles
+        self._size = [0] * max_vehicles
+        self._updated = [0] * max_vehicles
+        self._updates = 0
+        self._full = 0  # update in which every row was already used
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        """Preallocated storage size in bytes"""
+        return self.max_vehicles * (len(self.channels) + 1) * self.capacity * 8
+
+    def __row(self, mid):
+        """Get ring row of vehicle, replace least recently updated if full
+
+        Returns None if every row was updated in the current version.
+        """
+        row = self._rows.get(mid)
+        if row is not None:
+            return row
+        if len(self._rows) < self.max_vehicles:
+            row = len(self._rows)
+        else:
+            if self._full == self._updates:
+                return None
+            row = min(range(self.max_vehicles), key=self._updated.__getitem__)
+            if self._updated[row] == self._updates:
+                self._full = self._updates
+                return None
+            del self._rows[self._row_mid[row]]
+        self._rows[mid] = row
+        self._row_mid[row] = mid
+        self._head[row] = 0
+        self._size[row] = 0
+        return row
+
+    def record(self, name, data):
+        """Append new data version, SimInfoSync listener"""
+        if name != self.buffer:
+            return None
+        count = vehicle_count(data)
+        buffer_time = None if self._vehicle_time else self._buffer_time(data)
+        order = self._order
+        capacity = self.capacity
+        with self._lock:
+            self._updates += 1
+            for idx in range(count):
+                raw = self._unpack(data, self._vehicles_offset + idx * self._vehicle_size)
+                values = [0] * len(raw)
+                for position, index in enumerate(order):
+                    values[index] = raw[position]
+                if self._vehicle_time:
+                    sample_time = values[1]
+                    samples = values[2:]
+                else:
+                    sample_time = buffer_time
+                    samples = values[1:]
+
+                row = self.__row(values[0])
+                if row is None:
+                    continue
+                columns = self._columns[row]
+                head = self._head[row]
+                size = self._size[row]
+                if size:
+                    last_time = columns[0][head - 1]
+                    if sample_time == last_time:
+                        continue  # vehicle not updated in this version
+                    if sample_time < last_time:
+                        size = 0  # session restarted
+                columns[0][head] = sample_time
+                for column, value in enumerate(samples, 1):
+                    columns[column][head] = value
+                self._head[row] = (head + 1) % capacity
+                self._size[row] = min(size + 1, capacity)
+                self._updated[row] = self._updates
+
+    def query(self, vehicles=None, channels=None, seconds=None):
+        """Get history in chronological order
+
+        vehicles: vehicle mIDs, None for all recorded vehicles
+        channels: channel names, None for all channels
+        seconds: time window back from latest sample of each vehicle, None for all
+
+        Returns {mID: {"time": [...], channel: [...]}}
+        """
+        if channels is None:
+            channels = self.channels
+        unknown = set(channels) - set(self.channels)
+        if unknown:
+            raise ValueError(f"unknown channel: {', '.join(sorted(unknown))}")
+        columns_index = [0] + [self.channels.index(channel) + 1 for channel in channels]
+        result = {}
+        with self._lock:
+            mids = self._rows if vehicles is None else [mid for mid in vehicles if mid in self._rows]
+            for mid in mids:
+                row = self._rows[mid]
+                head, size = self._head[row], self._size[row]
+                start = (head - size) % self.capacity
+                columns = []
+                for index in columns_index:
+                    column = self._columns[row][index]
+                    if start + size <= self.capacity:
+                        columns.append(column[start:start + size].tolist())
+                    else:
+                        columns.append((column[start:] + column[:head]).tolist())
+                result[mid] = columns
+        output = {}
+        for mid, columns in result.items():
+            first = 0
+            if seconds is not None and columns[0]:
+                first = bisect.bisect_left(columns[0], columns[0][-1] - seconds)
+            output[mid] = {"time": columns[0][first:]}
+            for channel, column in zip(channels, columns[1:]):
+                output[mid][channel] = column[first:]
+        return output
@@ -0,0 +1,68 @@
+"""
+Client helper for the /raw/ binary endpoints
+
+Response bodies are the packed rF2 structures,
+read them into a preallocated buffer and map the rF2data classes
+on top of it with from_buffer, without copying.
+"""
+import ctypes
+import urllib.request
+
+try:
+    from .buffers import BUFFER_TYPES
+except ImportError:  # standalone, not package
+    from buffers import BUFFER_TYPES
+
+
+def from_bytes(buffer, payload):
+    """Map raw payload onto rF2 data class of buffer
+
+    Zero-copy if payload is a writable buffer (ex. bytearray) of full
+    structure size, otherwise (read-only or trimmed payload) it is copied
+    into a zero-filled structure.
+    """
+    rf2_data = BUFFER_TYPES[buffer]
+    size = ctypes.sizeof(rf2_data)
+    view = memoryview(payload)
+    if not view.readonly and view.nbytes >= size:
+        return rf2_data.from_buffer(payload)
+    data = rf2_data()
+    length = min(view.nbytes, size)
+    ctypes.memmove(ctypes.addressof(data), bytes(view[:length]), length)
+    return data
+
+
+class RawClient:
+    """Read rF2 structures from /raw/{buffer} endpoints
+
+    url: API base url, ex. http://localhost:8000
+    Each buffer keeps one preallocated receive buffer,
+    data returned by fetch is overwritten by next fetch of same buffer.
+    """
+
+    def __init__(self, url="http://localhost:8000"):
+        self._url = url.rstrip("/")
+        self._buffers = {}
+
+    def fetch(self, buffer, trim=False):
+        """Fetch buffer, return (data, version)
+
+        trim: only transfer active vehicle slots,
+        remaining slots of data are zero-filled.
+        """
+        rf2_data = BUFFER_TYPES[buffer]
+        target = self._buffers.get(buffer)
+        if target is None:
+            target = self._buffers[buffer] = bytearray(ctypes.sizeof(rf2_data))
+        url = f"{self._url}/raw/{buffer}?trim={str(trim).lower()}"
+        with urllib.request.urlopen(url) as response:
+            version = int(response.headers["X-rF2-Version"])
+            view = memoryview(target)
+            position = 0
+            while position < len(target):
+                read = response.readinto(view[position:])
+                if not read:
+                    break
+                position += read
+        view[position:] = bytes(len(target) - position)  # clear trimmed slots
+        return rf2_data.from_buffer(target), version
@@ -0,0 +1,268 @@
+"""
+rF2 shared memory session recorder
+
+Record every new version of shared memory buffers to an append-only,
+segmented log, and read it back by time.
+
+Recording directory layout:
+    00000.rec, 00001.rec, ...  segment files: header + records
+    00000.idx, 00001.idx, ...  time index: (timestamp, record offset) per record
+
+Segment header: magic, recording start time (seconds since epoch), segment number.
+Record: buffer id, mVersionUpdateEnd, timestamp (monotonic seconds since
+recording start), payload size, then payload: raw structure bytes,
+trimmed after last active vehicle slot.
+
+Recording into an existing recording directory appends new segments,
+timestamps continue after its last record (time between runs is left out).
+
+Records are queued by SimInfoSync listener and written by a background
+thread. Pending data is bounded, records are dropped (and counted)
+instead of blocking the updating thread when disk can not keep up.
+"""
+import bisect
+import ctypes
+import logging
+import os
+import struct
+import threading
+import time
+from collections import deque
+
+try:
+    from .buffers import snapshot_size
+except ImportError:  # standalone, not package
+    from buffers import snapshot_size
+
+MAGIC = b"RF2SNAP1"
+SEGMENT_HEADER = struct.Struct("<8sdI")
+RECORD_HEADER = struct.Struct("<BIdI")
+INDEX_ENTRY = struct.Struct("<dQ")
+
+BUFFER_IDS = {"scoring": 0, "telemetry": 1, "extended": 2, "ffb": 3}
+BUFFER_NAMES = {buffer_id: name for name, buffer_id in BUFFER_IDS.items()}
+
+
+def segment_path(path, number, extension):
+    """Segment or index file path"""
+    return os.path.join(path, f"{number:05d}.{extension}")
+
+
+def last_timestamp(path, segments):
+    """Timestamp of last indexed record of the first segments, None if no records"""
+    for number in reversed(range(segments)):
+        try:
+            with open(segment_path(path, number, "idx"), "rb") as index:
+                size = os.fstat(index.fileno()).st_size
+                usable = size - size % INDEX_ENTRY.size  # ignore partial entry
+                if usable:
+                    index.seek(usable - INDEX_ENTRY.size)
+                    return INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))[0]
+        except FileNotFoundError:
+            continue
+    return None
+
+
+class SnapshotRecorder:
+    """Record shared memory buffer versions to segmented log
+
+    path: recording directory, created if missing
+    buffers: buffer names to record
+    segment_bytes: start a new segment after this size
+    max_pending_bytes: maximum queued data waiting to be written
+    """
+
+    def __init__(self, path, buffers=("scoring", "telemetry", "extended"),
+                 segment_bytes=256 * 1024 * 1024, max_pending_bytes=64 * 1024 * 1024,
+                 logger=__name__):
+        self._logger = logging.getLogger(logger)
+        self._path = path
+        self._buffers = frozenset(buffers)
+        self._segment_bytes = segment_bytes
+        self._max_pending_bytes = max_pending_bytes
+        self._pending = deque()
+        self._pending_bytes = 0
+        self._wakeup = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._start_time = 0.0
+        self._start_wall_time = 0.0
+        self._first_segment = 0
+        self.records = 0
+        self.written_bytes = 0
+        self.dropped = 0
+
+    @property
+    def buffers(self):
+        """Recorded buffer names"""
+        return self._buffers
+
+    def start(self):
+        """Start recording thread"""
+        if self._running:
+            return None
+        os.makedirs(self._path, exist_ok=True)
+        number = 0
+        while os.path.exists(segment_path(self._path, number, "rec")):
+            number += 1  # append to existing recording
+        self._first_segment = number
+        # Continue timestamps after existing records, time index stays ordered
+        offset = last_timestamp(self._path, number) or 0.0
+        self._start_time = time.monotonic() - offset
+        self._start_wall_time = time.time() - offset
+        self._running = True
+        self._thread = threading.Thread(target=self.__run, daemon=True)
+        self._thread.start()
+        self._logger.info("recorder - recording to %s", self._path)
+
+    def stop(self):
+        """Stop recording, write remaining queued records"""
+        if not self._running:
+            return None
+        with self._wakeup:
+            self._running = False
+            self._wakeup.notify()
+        self._thread.join()
+        self._logger.info(
+            "recorder - stopped, %s records, %s bytes, %s dropped",
+            self.records, self.written_bytes, self.dropped)
+
+    def record(self, name, data):
+        """Queue new buffer version, SimInfoSync listener
+
+        Only copies the structure bytes, never blocks on disk I/O.
+        """
+        if name not in self._buffers or not self._running:
+            return None
+        timestamp = time.monotonic() - self._start_time
+        payload = ctypes.string_at(ctypes.addressof(data), snapshot_size(data))
+        with self._wakeup:
+            if self._pending_bytes + len(payload) > self._max_pending_bytes:
+                self.dropped += 1
+                return None
+            self._pending.append((BUFFER_IDS[name], data.mVersionUpdateEnd, timestamp, payload))
+            self._pending_bytes += len(payload)
+            self._wakeup.notify()
+
+    @property
+    def stats(self):
+        """Recording counters"""
+        return {
+            "path": self._path,
+            "recording": self._running,
+            "records": self.records,
+            "written_bytes": self.written_bytes,
+            "pending_bytes": self._pending_bytes,
+            "dropped": self.dropped,
+        }
+
+    def __open_segment(self, number):
+        """Open new segment and index file"""
+        segment = open(segment_path(self._path, number, "rec"), "wb")
+        index = open(segment_path(self._path, number, "idx"), "wb")
+        segment.write(SEGMENT_HEADER.pack(MAGIC, self._start_wall_time, number))
+        return segment, index
+
+    def __run(self):
+        """Recording thread"""
+        number = self._first_segment
+        segment, index = self.__open_segment(number)
+        try:
+            while True:
+                with self._wakeup:
+                    while self._running and not self._pending:
+                        self._wakeup.wait()
+                    if not self._pending:
+                        break  # stopped and drained
+                    batch = list(self._pending)
+                    self._pending.clear()
+                    self._pending_bytes = 0
+
+                for buffer_id, version, timestamp, payload in batch:
+                    if segment.tell() >= self._segment_bytes:
+                        segment.close()
+                        index.close()
+                        number += 1
+                        segment, index = self.__open_segment(number)
+                    index.write(INDEX_ENTRY.pack(timestamp, segment.tell()))
+                    segment.write(RECORD_HEADER.pack(buffer_id, version, timestamp, len(payload)))
+                    segment.write(payload)
+                    self.records += 1
+                    self.written_bytes += RECORD_HEADER.size + len(payload)
+                segment.flush()
+                index.flush()
+        except OSError:
+            self._logger.exception("recorder - write failed")
+            self._running = False
+        finally:
+            segment.close()
+            index.close()
+
+
+class Recording:
+    """Read a recording directory
+
+    Records are (buffer name, version, timestamp, payload bytes),
+    in recorded order. Use the time index to start reading at any time.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._segments = []
+        self._times = []      # first record timestamp of each segment
+        number = 0
+        while os.path.exists(segment_path(path, number, "rec")):
+            with open(segment_path(path, number, "rec"), "rb") as segment:
+                magic, start_wall_time, _ = SEGMENT_HEADER.unpack(
+                    segment.read(SEGMENT_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"not a rF2 recording segment: {segment_path(path, number, 'rec')}")
+            entries = self.__read_index(number)
+            if entries:
+                self._segments.append((number, entries))
+                self._times.append(entries[0][0])
+            if number == 0:
+                self.start_wall_time = start_wall_time
+            number += 1
+        if not self._segments:
+            raise ValueError(f"empty recording: {path}")
+
+    def __read_index(self, number):
+        """Read (timestamp, offset) entries of segment"""
+        with open(segment_path(self._path, number, "idx"), "rb") as index:
+            data = index.read()
+        usable = len(data) - len(data) % INDEX_ENTRY.size  # ignore partial entry
+        return [entry for entry in INDEX_ENTRY.iter_unpack(data[:usable])]
+
+    @property
+    def start(self):
+        """Timestamp of first record"""
+        return self._segments[0][1][0][0]
+
+    @property
+    def end(self):
+        """Timestamp of last record"""
+        return self._segments[-1][1][-1][0]
+
+    def records(self, start=None):
+        """Iterate records with timestamp >= start"""
+        first_segment = 0
+        if start is not None:
+            first_segment = max(bisect.bisect_right(self._times, start) - 1, 0)
+        for position, (number, entries) in enumerate(self._segments[first_segment:]):
+            first = 0
+            if start is not None and position == 0:
+                first = bisect.bisect_left([entry[0] for entry in entries], start)
+            if first >= len(entries):
+                continue
+            with open(segment_path(self._path, number, "rec"), "rb") as segment:
+                segment.seek(entries[first][1])
+                for _ in range(len(entries) - first):
+                    header = segment.read(RECORD_HEADER.size)
+                    if len(header) < RECORD_HEADER.size:
+                        break  # truncated by crash
+                    buffer_id, version, timestamp, size = RECORD_HEADER.unpack(header)
+                    payload = segment.read(size)
+                    if len(payload) < size:
+                        break
+                    yield BUFFER_NAMES[buffer_id], version, timestamp, payload
@@ -0,0 +1,190 @@
+"""
+rF2 shared memory replay
+
+Play a recording (see recorder.py) back into the rF2 shared memory
+mappings, so SimInfoSync and the API read it as if rF2 was running.
+Buffers are written with the plugin protocol: mVersionUpdateBegin first,
+then data, then mVersionUpdateEnd.
+
+Run from repository root:
+
+    python -m rf2_data.replay recordings/monza [--speed 1] [--start 0] [--loop]
+
+speed 0 writes records as fast as possible.
+"""
+import argparse
+import ctypes
+import logging
+import struct
+import threading
+import time
+
+try:
+    from . import recorder
+    from .buffers import BUFFER_TYPES, MMAP_NAMES
+    from .sim_info_sync import rF2MMap
+except ImportError:  # standalone, not package
+    import recorder
+    from buffers import BUFFER_TYPES, MMAP_NAMES
+    from sim_info_sync import rF2MMap
+
+_VERSION = struct.Struct("<I")
+
+
+class SharedMemoryWriter:
+    """Write structure bytes into rF2 shared memory mappings
+
+    buffers: buffer names to map
+    pid: rF2 process ID suffix of mapping names (Windows dedicated server)
+    """
+
+    def __init__(self, buffers=("scoring", "telemetry", "extended"), pid="", logger=__name__):
+        self._mmaps = {}
+        self._written = {}
+        self._layout = {}
+        for name in buffers:
+            rf2_data = BUFFER_TYPES[name]
+            mmap_info = rF2MMap(MMAP_NAMES[name], rf2_data, logger)
+            self._mmaps[name] = mmap_info.platform_mmap(
+                MMAP_NAMES[name], ctypes.sizeof(rf2_data), pid)
+            self._written[name] = 0
+            self._layout[name] = (
+                rf2_data.mVersionUpdateBegin.offset,
+                rf2_data.mVersionUpdateEnd.offset,
+                rf2_data.mVersionUpdateEnd.offset + _VERSION.size,
+            )
+
+    def write(self, name, version, payload, delay=0):
+        """Write payload to buffer mapping
+
+        Slots after a trimmed payload are cleared if last payload was longer.
+        delay: seconds to wait between begin and end version update,
+        readers see a torn (in progress) write meanwhile.
+        """
+        mmap_inst = self._mmaps[name]
+        begin, end, data_start = self._layout[name]
+        size = len(payload)
+        mmap_inst[begin:begin + _VERSION.size] = _VERSION.pack(version)
+        mmap_inst[data_start:size] = payload[data_start:]
+        if size < self._written[name]:
+            mmap_inst[size:self._written[name]] = bytes(self._written[name] - size)
+        self._written[name] = size
+        if delay:
+            time.sleep(delay)
+        mmap_inst[end:end + _VERSION.size] = _VERSION.pack(version)
+
+    def close(self):
+        """Close mappings"""
+        for mmap_inst in self._mmaps.values():
+            mmap_inst.close()
+        self._mmaps.clear()
+
+
+class Replayer:
+    """Play recording into shared memory in a background thread
+
+    recording: recorder.Recording
+    speed: playback speed factor, 0 for as fast as possible
+    loop: restart from beginning when recording ends
+    """
+
+    def __init__(self, recording, writer=None, speed=1.0, loop=False, logger=__name__):
+        self._logger = logging.getLogger(logger)
+        self._recording = recording
+        self._writer = writer or SharedMemoryWriter(logger=logger)
+        self.speed = speed
+        self.loop = loop
+        self._interrupt = threading.Event()
+        self._running = False
+        self._thread = None
+        self._seek = None
+        self.position = recording.start
+        self.records = 0
+
+    def start(self, position=None):
+        """Start playback thread, from position (seconds) or beginning"""
+        if self._running:
+            return None
+        self._seek = self._recording.start if position is None else position
+        self._running = True
+        self._interrupt.clear()
+        self._thread = threading.Thread(target=self.__run, daemon=True)
+        self._thread.start()
+        self._logger.info("replay - started at %.3f s, speed %s", self._seek, self.speed)
+
+    def stop(self):
+        """Stop playback thread"""
+        self._running = False
+        self._interrupt.set()
+        if self._thread:
+            self._thread.join()
+        self._logger.info("replay - stopped at %.3f s, %s records", self.position, self.records)
+
+    def seek(self, position):
+        """Continue playback from position (seconds)"""
+        self._seek = position
+        self._interrupt.set()
+
+    def join(self, timeout=None):
+        """Wait until playback ends (not looping) or is stopped"""
+        if self._thread:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        """Playback thread is running"""
+        return self._running
+
+    def __run(self):
+        """Playback thread"""
+        while self._running:
+            position, self._seek = self._seek, None
+            self._interrupt.clear()
+            origin = None
+            for name, version, timestamp, payload in self._recording.records(position):
+                if self.speed:
+                    if origin is None:
+                        origin = (time.monotonic(), timestamp)
+                    due = origin[0] + (timestamp - origin[1]) / self.speed
+                    delay = due - time.monotonic()
+                    if delay > 0 and self._interrupt.wait(delay):
+                        break
+                elif self._interrupt.is_set():
+                    break
+                self._writer.write(name, version, payload)
+                self.position = timestamp
+                self.records += 1
+            if not self._running:
+                break
+            if self._seek is None:  # reached end
+                if not self.loop:
+                    self._running = False
+                    break
+                self._seek = self._recording.start
+        self._logger.info("replay - finished at %.3f s", self.position)
+
+
+def main():
+    """Replay a recording from command line"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("path", help="recording directory")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--start", type=float, default=None, help="start position (seconds)")
+    parser.add_argument("--loop", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    recording = recorder.Recording(args.path)
+    print(f"recording: {recording.start:.3f} - {recording.end:.3f} s")
+    replayer = Replayer(recording, speed=args.speed, loop=args.loop)
+    replayer.start(args.start)
+    try:
+        while replayer.running:
+            replayer.join(0.5)
+    except KeyboardInterrupt:
+        pass
+    replayer.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+NumPy structured dtypes of rF2 shared memory structures
+
+Built from the `_fields_` tables of rF2data.py with explicit ctypes
+field offsets (Pack = 4), and verified against ctypes.sizeof and
+field offsets on import. Use them to get zero-copy array views over
+vehicle slots of a scoring or telemetry snapshot, so operations over
+all vehicles run vectorized:
+
+    vehicles = vehicles_view(scoring)
+    speed = vehicle_speed(vehicles)  # m/s of every active vehicle
+
+Requires numpy (optional dependency).
+"""
+import ctypes
+import numpy as np
+
+try:
+    from . import rf2_data as rF2data
+    from .buffers import MAX_VEHICLES, vehicle_count
+except ImportError:  # standalone, not package
+    import rf2_data as rF2data
+    from buffers import MAX_VEHICLES, vehicle_count
+
+
+def dtype_of(ctype):
+    """NumPy dtype equivalent of a ctypes type"""
+    if issubclass(ctype, ctypes.Structure):
+        names, formats, offsets = [], [], []
+        for name, ftype, *_ in ctype._fields_:
+            names.append(name)
+            formats.append(dtype_of(ftype))
+            offsets.append(getattr(ctype, name).offset)
+        return np.dtype({
+            "names": names,
+            "formats": formats,
+            "offsets": offsets,
+            "itemsize": ctypes.sizeof(ctype),
+        })
+    if issubclass(ctype, ctypes.Array):
+        if ctype._type_ is ctypes.c_char:
+            return np.dtype(f"S{ctype._length_}")
+        return np.dtype((dtype_of(ctype._type_), (ctype._length_,)))
+    if ctype is ctypes.c_char:
+        return np.dtype("S1")
+    return np.dtype(ctype)
+
+
+def verify(dtype, ctype):
+    """Check dtype layout matches ctypes structure, raise TypeError if not"""
+    if dtype.itemsize != ctypes.sizeof(ctype):
+        raise TypeError(
+            f"{ctype.__name__}: dtype size {dtype.itemsize} != {ctypes.sizeof(ctype)}")
+    if not issubclass(ctype, ctypes.Structure):
+        return None
+    for name, ftype, *_ in ctype._fields_:
+        field_dtype, offset = dtype.fields[name][:2]
+        if offset != getattr(ctype, name).offset:
+            raise TypeError(f"{ctype.__name__}.{name}: dtype offset {offset} mismatch")
+        if field_dtype.subdtype is not None and issubclass(ftype, ctypes.Array):
+            field_dtype, ftype = field_dtype.subdtype[0], ftype._type_
+        verify(field_dtype, ftype)
+
+
+WHEEL_DTYPE = dtype_of(rF2data.rF2Wheel)
+VEHICLE_TELEMETRY_DTYPE = dtype_of(rF2data.rF2VehicleTelemetry)
+VEHICLE_SCORING_DTYPE = dtype_of(rF2data.rF2VehicleScoring)
+
+verify(WHEEL_DTYPE, rF2data.rF2Wheel)
+verify(VEHICLE_TELEMETRY_DTYPE, rF2data.rF2VehicleTelemetry)
+verify(VEHICLE_SCORING_DTYPE, rF2data.rF2VehicleScoring)
+
+_VEHICLE_DTYPES = {
+    rF2data.rF2Scoring: VEHICLE_SCORING_DTYPE,
+    rF2data.rF2Telemetry: VEHICLE_TELEMETRY_DTYPE,
+}
+
+
+def vehicles_view(data, active=True):
+    """Zero-copy structured array over vehicle slots
+
+    data: rF2Scoring or rF2Telemetry instance
+    active: only active vehicle slots (mNumVehicles), otherwise all mapped slots
+
+    The array shares memory with data (and keeps it alive),
+    use a copy access snapshot for consistent values.
+    """
+    dtype = _VEHICLE_DTYPES[type(data)]
+    count = vehicle_count(data) if active else MAX_VEHICLES
+    return np.frombuffer(
+        data, dtype=dtype, count=count, offset=type(data).mVehicles.offset)
+
+
+def vehicle_speed(vehicles):
+    """Speed (m/s) of every vehicle from mLocalVel"""
+    velocity = vehicles["mLocalVel"]
+    return np.sqrt(velocity["x"] ** 2 + velocity["y"] ** 2 + velocity["z"] ** 2)
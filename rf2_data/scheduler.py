@@ -0,0 +1,217 @@
+"""
+Adaptive shared memory poll scheduler
+
+Track the interval between mVersionUpdateEnd changes of each buffer,
+and schedule the next read just after the expected next plugin write,
+instead of polling at a fixed rate.
+"""
+import time
+
+
+class BufferRate:
+    """Observed update interval and jitter of a buffer
+
+    smoothing: weight of new interval samples (exponential moving average)
+    max_interval: longer gaps (pause, loading) are not learned
+    """
+
+    __slots__ = (
+        "smoothing", "max_interval", "version", "last_update", "last_read",
+        "interval", "jitter", "reads", "updates", "samples",
+    )
+
+    def __init__(self, smoothing=0.1, max_interval=1.0):
+        self.smoothing = smoothing
+        self.max_interval = max_interval
+        self.version = None
+        self.last_update = None  # estimated time of last write
+        self.last_read = None    # time of last read without change
+        self.interval = None     # seconds between plugin writes
+        self.jitter = 0.0        # mean absolute deviation of interval
+        self.reads = 0
+        self.updates = 0
+        self.samples = 0
+
+    def observe(self, version, now):
+        """Observe buffer version at time now, return True if changed
+
+        The write happened between the previous read and now, estimated
+        as the predicted write time clamped to that window, so the delay
+        of reads after writes is not accumulated into the schedule.
+        """
+        self.reads += 1
+        if version == self.version:
+            self.last_read = now
+            return False
+        write_time = now
+        if self.version is not None and self.last_update is not None:
+            writes = (version - self.version) & 0xFFFFFFFF  # including missed writes
+            if 0 < writes <= 16 and now - self.last_update < self.max_interval:
+                if self.interval is not None:
+                    predicted = self.last_update + self.interval * writes
+                    earliest = self.last_read if self.last_read is not None else now
+                    write_time = min(max(predicted, earliest), now)
+                self.__learn((write_time - self.last_update) / writes)
+        self.version = version
+        self.last_update = write_time
+        self.last_read = now
+        self.updates += 1
+        return True
+
+    def __learn(self, interval):
+        """Add interval sample"""
+        self.samples += 1
+        if self.interval is None:
+            self.interval = interval
+            return None
+        deviation = abs(interval - self.interval)
+        self.interval += self.smoothing * (interval - self.interval)
+        self.jitter += self.smoothing * (deviation - self.jitter)
+
+    def expected(self):
+        """Expected time of next write, None if not known yet"""
+        if self.interval is None or self.samples < 3:
+            return None
+        return self.last_update + self.interval
+
+    @property
+    def stats(self):
+        """Observed rate counters"""
+        return {
+            "reads": self.reads,
+            "updates": self.updates,
+            "rate_hz": 1 / self.interval if self.interval else None,
+            "interval_ms": self.interval * 1000 if self.interval else None,
+            "jitter_ms": self.jitter * 1000,
+            "age_seconds": (
+                time.monotonic() - self.last_update if self.last_update is not None else None),
+        }
+
+
+ADAPTIVE = "adaptive"
+
+# Read cadence by buffer name
+DEFAULT_CADENCES = {
+    "telemetry": ADAPTIVE,
+    "scoring": ADAPTIVE,
+    "extended": 0.01,
+    "ffb": 0.01,
+}
+
+
+class PollScheduler:
+    """Schedule shared memory reads of each buffer on its own cadence
+
+    cadences: read cadence by buffer name (DEFAULT_CADENCES keys), one of
+        ADAPTIVE: just after expected next write of the buffer,
+        seconds: fixed read interval,
+        None: do not read buffer.
+    margin: seconds to read after the expected write, lower is
+        fresher data but more early (wasted) reads
+    min_interval: shortest adaptive read interval
+    max_interval: longest delay between reads while updates are predictable
+    default_interval: adaptive interval while update rate is unknown or write is overdue
+    retry_interval: adaptive interval while an expected write is late
+    """
+
+    def __init__(self, cadences=None, margin=0.001,
+                 min_interval=0.001, max_interval=0.05, default_interval=0.01,
+                 retry_interval=0.001, smoothing=0.1):
+        self.cadences = dict(DEFAULT_CADENCES)
+        self._due = {}  # next read time by buffer name
+        for name, cadence in (cadences or {}).items():
+            self.set_cadence(name, cadence)
+        self.margin = margin
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.retry_interval = retry_interval
+        self._smoothing = smoothing
+        self._rates = {}
+        self.loops = 0
+        self.overdue = 0  # adaptive reads scheduled while an expected write was late
+
+    def set_cadence(self, name, cadence):
+        """Set read cadence of buffer (see cadences)
+
+        Buffer names are fixed, the updating thread iterates cadences
+        without locking, so unknown names raise ValueError.
+        """
+        if name not in self.cadences:
+            raise ValueError(f"unknown buffer: {name}")
+        if cadence is not None and cadence != ADAPTIVE and not cadence > 0:
+            raise ValueError(f"invalid cadence: {cadence}")
+        self.cadences[name] = cadence
+        self._due.pop(name, None)
+
+    def rate(self, name):
+        """Get BufferRate of buffer"""
+        rate = self._rates.get(name)
+        if rate is None:
+            rate = self._rates[name] = BufferRate(self._smoothing)
+        return rate
+
+    def enabled(self):
+        """Names of buffers with a read cadence"""
+        return {name for name, cadence in self.cadences.items() if cadence is not None}
+
+    def due(self, now):
+        """Names of buffers to read now"""
+        return [
+            name for name, cadence in self.cadences.items()
+            if cadence is not None and self._due.get(name, now) <= now
+        ]
+
+    def observe(self, name, version, now):
+        """Observe buffer version after a read and schedule next read,
+        return True if changed"""
+        rate = self.rate(name)
+        changed = rate.observe(version, now)
+        cadence = self.cadences.get(name)
+        if cadence == ADAPTIVE:
+            self._due[name] = now + self.__adaptive_delay(rate, now)
+        elif cadence is not None:
+            self._due[name] = max(self._due.get(name, now) + cadence, now)
+        return changed
+
+    def __adaptive_delay(self, rate, now):
+        """Delay until just after expected next write of buffer"""
+        expected = rate.expected()
+        if expected is None:
+            return self.default_interval
+        read_time = expected + self.margin
+        if read_time <= now:
+            # Write is late, retry quickly within jitter tolerance,
+            # then fall back to default polling
+            self.overdue += 1
+            if now - expected <= max(rate.jitter * 4, self.margin * 2, self.retry_interval):
+                return self.retry_interval
+            return self.default_interval
+        return min(max(read_time - now, self.min_interval), self.max_interval)
+
+    def delay(self, now, names=None):
+        """Seconds to wait before next read
+
+        names: buffers being read, default all buffers with a cadence
+        """
+        self.loops += 1
+        due = [
+            self._due.get(name, now) for name, cadence in self.cadences.items()
+            if cadence is not None and (names is None or name in names)
+        ]
+        if not due:
+            return self.default_interval
+        return min(max(min(due) - now, 0.0), self.max_interval)
+
+    @property
+    def stats(self):
+        """Observed rates of every buffer and read counters"""
+        buffers = {}
+        for name, rate in self._rates.items():
+            buffers[name] = rate.stats
+            buffers[name]["cadence"] = self.cadences.get(name)
+        return {
+            "loops": self.loops,
+            "overdue": self.overdue,
+            "buffers": buffers,
+        }
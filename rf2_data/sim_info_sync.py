@@ -7,21 +7,102 @@ and add access & synchronize functions to it.
 """
 import ctypes
 import mmap
+import struct
 import time
 import threading
-import copy
 import platform
 import logging
+import weakref
+from typing import NamedTuple
 
 try:
     from . import rf2_data as rF2data
 except ImportError:  # standalone, not package
     import rf2_data as rF2data
 
+try:
+    from . import recorder
+    from .buffers import MMAP_NAMES, vehicle_count
+    from .scheduler import PollScheduler
+except ImportError:  # standalone, not package
+    import recorder
+    from buffers import MMAP_NAMES, vehicle_count
+    from scheduler import PollScheduler
+
+try:  # optional, requires numpy
+    try:
+        from . import rf2_numpy
+    except ImportError:  # standalone, not package
+        import rf2_numpy
+except ImportError:
+    rf2_numpy = None
+
 PLATFORM = platform.system()
+VERSION_FORMAT = struct.Struct("<I")  # mVersionUpdateBegin/End
 MAX_VEHICLES = rF2data.rFactor2Constants.MAX_MAPPED_VEHICLES
 INVALID_INDEX = -1
 
+# Buffers always mapped and read: session activity and player sync
+CORE_BUFFERS = frozenset(("scoring", "telemetry"))
+
+
+class StructurePool:
+    """Preallocated storage of a ctypes structure, reused once released
+
+    Instances are from_buffer views over pooled bytearrays. A bytearray
+    returns to the pool (weakref.finalize) only when its instance is no
+    longer referenced, sub structures and NumPy views keep the instance
+    alive, so storage is never rewritten while data is in use.
+
+    ctype: ctypes structure class, ex. rF2data.rF2Telemetry
+    """
+
+    def __init__(self, ctype):
+        self._ctype = ctype
+        self._size = ctypes.sizeof(ctype)
+        self._free = []  # released bytearrays, list append/pop are atomic
+        self.allocations = 0  # bytearrays allocated
+
+    def acquire(self):
+        """Structure instance owned by caller, with undefined content"""
+        try:
+            buffer = self._free.pop()
+        except IndexError:
+            buffer = bytearray(self._size)
+            self.allocations += 1
+        data = self._ctype.from_buffer(buffer)
+        weakref.finalize(data, self._free.append, buffer)
+        return data
+
+    def copy(self, source):
+        """Structure instance with a copy of source data (memmove)"""
+        data = self.acquire()
+        ctypes.memmove(ctypes.addressof(data), ctypes.addressof(source), self._size)
+        return data
+
+
+class Snapshot(NamedTuple):
+    """Published set of buffer snapshots
+
+    Buffers were read together in one update of the updating thread,
+    and are never modified after publication. A new generation is
+    published by replacing SimInfoSync.snapshot, so readers holding
+    one keep a consistent view without locking.
+    Buffers which were never mapped are None.
+
+    vehicles: (mID, scoring slot, telemetry slot) of every active vehicle
+    in scoring order, telemetry slot is INVALID_INDEX if not found.
+    """
+
+    generation: int
+    time: float  # monotonic publication time
+    active: bool  # player data not paused
+    scoring: rF2data.rF2Scoring
+    telemetry: rF2data.rF2Telemetry
+    extended: rF2data.rF2Extended
+    ffb: rF2data.rF2ForceFeedback
+    vehicles: tuple
+
 
 class rF2MMap:
     """Create mmap for accessing rF2 shared memory
@@ -30,16 +111,30 @@ class rF2MMap:
     rf2_data: rf2 data class defined in rF2data.py, ex. rF2data.rF2Scoring
     rf2_pid: rf2 Process ID for server
     logger: logger name
+    max_retries: immediate copy retries after a torn read
     """
 
-    def __init__(self, mmap_name, rf2_data, logger=__name__):
+    def __init__(self, mmap_name, rf2_data, logger=__name__, max_retries=3):
         self._logger = logging.getLogger(logger)
         self._mmap_name = mmap_name
         self._rf2_data = rf2_data
         self._mmap_inst = None
+        self._mmap_view = None  # mmap view, memmove source
         self._mmap_data = None
+        self._pool = StructurePool(rf2_data)  # copy targets
+        self._direct_snapshot = None  # last snapshot() copy in direct access mode
         self._access_mode = 0
         self._direct_access_active = False
+        self._version_offset = rf2_data.mVersionUpdateEnd.offset
+        self._begin_offset = rf2_data.mVersionUpdateBegin.offset
+        self.max_retries = max_retries
+        self.copies = 0       # accepted copies
+        self.skipped = 0      # copies skipped, version unchanged
+        self.torn_reads = 0   # copies rejected, buffer written during copy
+        self.retries = 0      # copy attempts after a torn read
+        self.stale_reads = 0  # updates keeping previous data after all retries
+        self.copy_seconds = 0.0  # time spent copying
+        self.copy_bytes = 0  # bytes copied, including retries
 
     def create(self, access_mode=0, rf2_pid=""):
         """Create mmap instance"""
@@ -49,6 +144,8 @@ class rF2MMap:
             size=ctypes.sizeof(self._rf2_data),
             pid=rf2_pid
         )
+        self._mmap_view = (
+            ctypes.c_char * ctypes.sizeof(self._rf2_data)).from_buffer(self._mmap_inst)
         mode_text = "Direct" if access_mode else "Copy"
         self._logger.info(
             "sharedmemory - %s > ACTIVE: %s Access",
@@ -58,10 +155,16 @@ class rF2MMap:
     def close(self):
         """Close memory mapping
 
-        Create a final accessible mmap data copy before closing mmap instance.
+        Create a final accessible mmap data copy before closing mmap instance,
+        in direct access mode the last snapshot if the final copy is torn.
         """
-        self.copy_access()
+        if self._direct_access_active:
+            self._mmap_data = self.snapshot()
+        else:
+            self.copy_access()
         self._direct_access_active = False
+        self._direct_snapshot = None
+        self._mmap_view = None  # release view before closing
         try:
             self._mmap_inst.close()
             self._logger.info("sharedmemory - %s > CLOSE", self._mmap_name.strip("$"))
@@ -89,12 +192,90 @@ class rF2MMap:
 
         Accessing mmap data by copying mmap instance
         and using version check to avoid data desync or interruption.
+        Copy is skipped if mVersionUpdateEnd is unchanged since last copy.
+
+        Seqlock read: a copy is accepted if no write was in progress when
+        copying started (begin == end version), and no new write began
+        during copying (begin version unchanged afterwards). Torn copies are
+        retried immediately up to max_retries times, then previous data is kept.
+
+        Data is copied with memmove into preallocated pool storage, which
+        is published by replacing the data reference when accepted and
+        never written again while referenced. Storage of replaced and
+        rejected copies returns to the pool.
         """
-        data_temp = self._rf2_data.from_buffer_copy(self._mmap_inst)
-        if self.version_check(data_temp):
-            self._mmap_data = data_temp
-        elif not self._mmap_data:
+        if (self._mmap_data is not None and not self._direct_access_active
+                and self.peek_version() == self._mmap_data.mVersionUpdateEnd):
+            self.skipped += 1
+            return None
+        data_temp, valid = self.__copy()
+        if valid or not self._mmap_data:
             self._mmap_data = data_temp
+        else:
+            self.stale_reads += 1
+
+    def __copy(self):
+        """Seqlock copy of mmap into pool storage, return (data, valid)"""
+        data_temp = self._pool.acquire()
+        address = ctypes.addressof(data_temp)
+        source = ctypes.addressof(self._mmap_view)
+        size = ctypes.sizeof(data_temp)
+        start = time.perf_counter()
+        valid = False
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+            ctypes.memmove(address, source, size)
+            self.copy_bytes += size
+            if (self.version_check(data_temp)
+                    and self.peek_begin_version() == data_temp.mVersionUpdateEnd):
+                self.copies += 1
+                valid = True
+                break
+            self.torn_reads += 1
+        self.copy_seconds += time.perf_counter() - start
+        return data_temp, valid
+
+    def snapshot(self):
+        """Consistent data snapshot, never modified after return
+
+        Copy access data is a snapshot already. In direct access mode,
+        mmap is copied (seqlock read) once per new version instead,
+        as the direct access data changes while being read.
+        """
+        if not self._direct_access_active:
+            return self._mmap_data
+        data = self._direct_snapshot
+        if data is not None and self.peek_version() == data.mVersionUpdateEnd:
+            return data
+        data_temp, valid = self.__copy()
+        if valid or data is None:
+            self._direct_snapshot = data_temp
+        else:
+            self.stale_reads += 1
+        return self._direct_snapshot
+
+    def peek_version(self):
+        """Read mVersionUpdateEnd from mmap without copying data"""
+        return VERSION_FORMAT.unpack_from(self._mmap_inst, self._version_offset)[0]
+
+    def peek_begin_version(self):
+        """Read mVersionUpdateBegin from mmap without copying data"""
+        return VERSION_FORMAT.unpack_from(self._mmap_inst, self._begin_offset)[0]
+
+    @property
+    def stats(self):
+        """Copy access counters"""
+        return {
+            "copies": self.copies,
+            "skipped": self.skipped,
+            "torn_reads": self.torn_reads,
+            "retries": self.retries,
+            "stale_reads": self.stale_reads,
+            "allocations": self._pool.allocations,
+            "copy_seconds": self.copy_seconds,
+            "copy_bytes": self.copy_bytes,
+        }
 
     def platform_mmap(self, name, size, pid=""):
         """Platform memory mapping"""
@@ -129,6 +310,34 @@ class rF2MMap:
         return self._mmap_data
 
 
+class VehicleIndex:
+    """mID to vehicle slot index of a rF2 buffer
+
+    Index is rebuilt only when buffer version or data object changes
+    (version restarts with the writer), lookups are dict access
+    instead of scanning all vehicle slots.
+    """
+
+    def __init__(self):
+        self._index = (None, lambda: None, {})  # (mVersionUpdateEnd, data ref, {mID: slot})
+
+    def __rebuild(self, data):
+        """Rebuild index from active vehicle slots"""
+        slots = {}
+        vehicles = data.mVehicles
+        for idx in range(vehicle_count(data)):
+            slots.setdefault(vehicles[idx].mID, idx)
+        self._index = (data.mVersionUpdateEnd, weakref.ref(data), slots)
+        return slots
+
+    def find(self, data, mid):
+        """Find vehicle slot index of mID in data"""
+        version, ref, slots = self._index
+        if version != data.mVersionUpdateEnd or ref() is not data:
+            slots = self.__rebuild(data)
+        return slots.get(mid, INVALID_INDEX)
+
+
 class SimInfoSync():
     """
     API for rF2 shared memory
@@ -149,6 +358,25 @@ class SimInfoSync():
         self._rf2_pid = ""
         self._access_mode = 0
         self._logger = logging.getLogger(logger)
+        self._listeners = []
+        self._listener_versions = {}
+        self._scor_index = VehicleIndex()
+        self._tele_index = VehicleIndex()
+        self._player_scor_pool = StructurePool(rF2data.rF2VehicleScoring)
+        self._player_tele_pool = StructurePool(rF2data.rF2VehicleTelemetry)
+        self._recorder = None
+        self._scheduler = PollScheduler()
+        self._demand_lock = threading.Lock()
+        self._active = CORE_BUFFERS  # mapped buffers, replaced on change
+        self._owners = {}   # buffer name -> owners keeping it mapped
+        self._touched = {}  # buffer name -> last access time
+        self._idle_timeout = 10.0
+        self._publish_lock = threading.Lock()
+        self._snapshot = None
+        self._loops = 0
+        self._loop_seconds = 0.0  # updating loop time, excluding sleep
+        self._transitions = dict.fromkeys(
+            ("data_paused", "data_unpaused", "player_paused", "player_unpaused"), 0)
         self.init_mmap(logger)
 
     @staticmethod
@@ -159,17 +387,13 @@ class SimInfoSync():
                 return idx_scor
         return INVALID_INDEX
 
-    @staticmethod
-    def __find_local_tele_index(data_tele, mid_scor):
+    def __find_local_tele_index(self, data_tele, mid_scor):
         """Find local player telemetry index
 
         Telemetry index can be different from scoring index.
         Use mID matching to find telemetry index.
         """
-        for idx_tele in range(MAX_VEHICLES):
-            if data_tele.mVehicles[idx_tele].mID == mid_scor:
-                return idx_tele
-        return INVALID_INDEX
+        return self._tele_index.find(data_tele, mid_scor)
 
     def __sync_local_player_data(self, data_scor, data_tele):
         """Sync local player data
@@ -185,22 +409,37 @@ class SimInfoSync():
                 return False
             self._player_scor_index = idx_scor
         self._player_scor_mid = data_scor.mVehicles[self._player_scor_index].mID
-        self._player_scor = copy.deepcopy(data_scor.mVehicles[self._player_scor_index])
+        self._player_scor = self._player_scor_pool.copy(data_scor.mVehicles[self._player_scor_index])
 
         idx_tele = self.__find_local_tele_index(data_tele, self._player_scor_mid)
         if idx_tele == INVALID_INDEX:
             return True  # found 1 index
         self._player_tele_index = idx_tele
-        self._player_tele = copy.deepcopy(data_tele.mVehicles[idx_tele])
+        self._player_tele = self._player_tele_pool.copy(data_tele.mVehicles[idx_tele])
         return True  # found 2 index
 
     def find_player_index_tele(self, index_scor):
         """Find player index using mID"""
         scor_mid = self._info_scor.data.mVehicles[index_scor].mID
-        for index in range(MAX_VEHICLES):
-            if self._info_tele.data.mVehicles[index].mID == scor_mid:
-                return index
-        return INVALID_INDEX
+        return self._tele_index.find(self._info_tele.data, scor_mid)
+
+    def findScorIndex(self, mid, data_scor=None):
+        """Find scoring vehicle index of mID
+
+        Specify data_scor to look up in a previously read scoring data.
+        """
+        if data_scor is None:
+            data_scor = self._info_scor.data
+        return self._scor_index.find(data_scor, mid)
+
+    def findTeleIndex(self, mid, data_tele=None):
+        """Find telemetry vehicle index of mID
+
+        Specify data_tele to look up in a previously read telemetry data.
+        """
+        if data_tele is None:
+            data_tele = self._info_tele.data
+        return self._tele_index.find(data_tele, mid)
 
     def __update(self):
         """Update synced player data"""
@@ -211,9 +450,25 @@ class SimInfoSync():
         update_delay = 0.5  # longer delay while inactive
 
         while self._updating:
-            self.update_mmap()
+            # Read buffers due on their own cadence, all buffers while inactive
+            loop_start = time.perf_counter()
+            now = time.monotonic()
+            if data_freezed:
+                names = self._scheduler.enabled() | {"scoring"}
+            else:
+                names = self._scheduler.due(now)
+            active = self._active
+            names = [name for name in names if name in active]
+            changed = False
+            for name in names:
+                info = self._mmap_infos[name]
+                info.update()
+                if self._scheduler.observe(name, info.data.mVersionUpdateEnd, now):
+                    changed = True
+            self.__notify_listeners(names)
+            self.__release_idle_buffers(now)
             # Update player data & index
-            if not data_freezed:
+            if not data_freezed and ("scoring" in names or "telemetry" in names):
                 # Get player data
                 data_synced = self.__sync_local_player_data(
                     self._info_scor.data, self._info_tele.data)
@@ -222,19 +477,22 @@ class SimInfoSync():
                     reset_counter += 1
                 elif data_synced:
                     reset_counter = 0
+                    if self._paused:
+                        self._transitions["player_unpaused"] += 1
                     self._paused = False
                 # Activate pause
                 if reset_counter == 5:
                     self._paused = True
+                    self._transitions["player_paused"] += 1
                     self._logger.info("sharedmemory - player data paused")
 
             # Start checking data version update status
             if time.time() - check_timer_start > 5:
                 if (not data_freezed
                     and last_version_update == self._info_scor.data.mVersionUpdateEnd):
-                    update_delay = 0.5
                     data_freezed = True
                     self._paused = True
+                    self._transitions["data_paused"] += 1
                     self._logger.info(
                         "sharedmemory - data paused, version %s",
                         last_version_update
@@ -244,20 +502,196 @@ class SimInfoSync():
 
             if (data_freezed
                 and last_version_update != self._info_scor.data.mVersionUpdateEnd):
-                update_delay = 0.01
                 data_freezed = False
                 self._paused = False
+                self._transitions["data_unpaused"] += 1
                 self._logger.info(
                     "sharedmemory - data unpaused, version %s",
                     self._info_scor.data.mVersionUpdateEnd
                 )
 
-            time.sleep(update_delay)
+            if changed or self._snapshot.active == self._paused:
+                self.__publish_snapshot()
+            self._loops += 1
+            self._loop_seconds += time.perf_counter() - loop_start
+
+            # Read just after expected next write while active
+            if data_freezed:
+                time.sleep(update_delay)
+            else:
+                time.sleep(self._scheduler.delay(time.monotonic(), self._active))
 
         self._stopped = True
         self._paused = False
         self._logger.info("sharedmemory - updating thread stopped")
 
+    def __publish_snapshot(self):
+        """Publish snapshot of current buffer data as next generation"""
+        with self._publish_lock:  # writers only, readers never lock
+            infos = self._mmap_infos
+            last = self._snapshot
+            data_scor = infos["scoring"].snapshot()
+            data_tele = infos["telemetry"].snapshot()
+            if last and last.scoring is data_scor and last.telemetry is data_tele:
+                vehicles = last.vehicles
+            else:
+                vehicles = self.__join_vehicles(data_scor, data_tele)
+            self._snapshot = Snapshot(
+                generation=last.generation + 1 if last else 1,
+                time=time.monotonic(),
+                active=not self._paused,
+                scoring=data_scor,
+                telemetry=data_tele,
+                extended=infos["extended"].snapshot(),
+                ffb=infos["ffb"].snapshot(),
+                vehicles=vehicles,
+            )
+
+    def __join_vehicles(self, data_scor, data_tele):
+        """Join scoring and telemetry vehicle slots by mID, once per version pair"""
+        if data_scor is None or data_tele is None:
+            return ()
+        vehicles = data_scor.mVehicles
+        find_tele = self._tele_index.find
+        return tuple(
+            (vehicles[idx].mID, idx, find_tele(data_tele, vehicles[idx].mID))
+            for idx in range(vehicle_count(data_scor))
+        )
+
+    def __notify_listeners(self, names):
+        """Notify listeners of read buffers with a new data version
+
+        Listeners get the buffer snapshot (see rF2MMap.snapshot),
+        never the live mapping of direct access mode.
+        """
+        if not self._listeners:
+            return None
+        for name in names:
+            data = self._mmap_infos[name].snapshot()
+            version = data.mVersionUpdateEnd
+            if self._listener_versions.get(name) == version:
+                continue
+            self._listener_versions[name] = version
+            for listener in self._listeners:
+                try:
+                    listener(name, data)
+                except Exception:
+                    self._logger.exception("sharedmemory - listener failed")
+
+    def addListener(self, listener):
+        """Add data update listener
+
+        listener(name, data) is called from updating thread
+        once per new mVersionUpdateEnd of each buffer (see buffers),
+        data is a snapshot which is never modified afterwards.
+        """
+        self._listeners.append(listener)
+
+    def removeListener(self, listener):
+        """Remove data update listener"""
+        self._listeners.remove(listener)
+
+    def setScheduler(self, scheduler):
+        """Set poll scheduler (see scheduler.PollScheduler)
+
+        Raises ValueError if scheduler does not read scoring.
+        """
+        if scheduler.cadences.get("scoring") is None:
+            raise ValueError("scoring cadence cannot be None")
+        self._scheduler = scheduler
+
+    def setCadence(self, name, cadence):
+        """Set read cadence of buffer
+
+        cadence: scheduler.ADAPTIVE, interval in seconds, or None to stop reading.
+        Scoring is always read, session activity and freezes are detected
+        from its version, so None raises ValueError for scoring.
+        Unknown buffer names raise ValueError.
+        """
+        if name == "scoring" and cadence is None:
+            raise ValueError("scoring cadence cannot be None")
+        self._scheduler.set_cadence(name, cadence)
+
+    def acquireBuffer(self, name, owner):
+        """Map and read buffer until released by owner
+
+        Extended and force feedback buffers are only mapped while acquired
+        or recently accessed. Names which are not buffers are ignored.
+        """
+        if name not in self._mmap_infos:
+            return None
+        with self._demand_lock:
+            self._owners.setdefault(name, set()).add(owner)
+        self.__activate_buffer(name)
+
+    def releaseBuffer(self, name, owner):
+        """Release buffer acquired by owner, unmapped after idle timeout"""
+        with self._demand_lock:
+            owners = self._owners.get(name)
+            if not owners or owner not in owners:
+                return None
+            owners.discard(owner)
+        self._touched[name] = time.monotonic()
+
+    def touchBuffer(self, name):
+        """Mark buffer as accessed now, map and read it if not mapped"""
+        self._touched[name] = time.monotonic()
+        self.__activate_buffer(name)
+
+    def setIdleTimeout(self, seconds=10.0):
+        """Set seconds without access or owner before a buffer is unmapped"""
+        self._idle_timeout = seconds
+
+    def __activate_buffer(self, name):
+        """Map buffer and read it once, while updating"""
+        if name in self._active or self._stopped:
+            return None
+        with self._demand_lock:
+            if name in self._active or self._stopped:
+                return None
+            info = self._mmap_infos[name]
+            info.create(self._access_mode, self._rf2_pid)
+            info.update()
+            self._active = self._active | {name}
+        self.__publish_snapshot()
+
+    def __release_idle_buffers(self, now):
+        """Unmap buffers without owners and recent access"""
+        for name in self._active - CORE_BUFFERS:
+            if self._owners.get(name) or now - self._touched.get(name, 0) < self._idle_timeout:
+                continue
+            with self._demand_lock:
+                if self._owners.get(name):
+                    continue
+                self._active = self._active - {name}
+                self._mmap_infos[name].close()
+
+    def startRecording(self, path, **options):
+        """Record new versions of buffers to path (see recorder.SnapshotRecorder)
+
+        Disk writes happen in recorder thread, updating thread only queues data.
+        """
+        if self._recorder is not None:
+            return None
+        self._recorder = recorder.SnapshotRecorder(path, logger=self._logger.name, **options)
+        self._recorder.start()
+        for name in self._recorder.buffers:
+            self.acquireBuffer(name, self._recorder)
+        if not self._stopped:  # current versions were already notified
+            for name in self._active:
+                self._recorder.record(name, self._mmap_infos[name].snapshot())
+        self.addListener(self._recorder.record)
+
+    def stopRecording(self):
+        """Stop recording, wait for queued data to be written"""
+        if self._recorder is None:
+            return None
+        self.removeListener(self._recorder.record)
+        for name in self._recorder.buffers:
+            self.releaseBuffer(name, self._recorder)
+        self._recorder.stop()
+        self._recorder = None
+
     def start(self):
         """Start data updating thread
 
@@ -266,9 +700,13 @@ class SimInfoSync():
         if not self._stopped:
             return None
 
+        with self._demand_lock:
+            self._active = CORE_BUFFERS | {
+                name for name, owners in self._owners.items() if owners}
         self.create_mmap()
         self.update_mmap()
         self.copy_mmap_player()
+        self.__publish_snapshot()
         self._updating = True
         self._stopped = False
         self._thread = threading.Thread(target=self.__update, daemon=True)
@@ -297,34 +735,35 @@ class SimInfoSync():
     def init_mmap(self, logger):
         """Initialize mmap info"""
         self._info_scor = rF2MMap(
-            "$rFactor2SMMP_Scoring$", rF2data.rF2Scoring, logger)
+            MMAP_NAMES["scoring"], rF2data.rF2Scoring, logger)
         self._info_tele = rF2MMap(
-            "$rFactor2SMMP_Telemetry$", rF2data.rF2Telemetry, logger)
+            MMAP_NAMES["telemetry"], rF2data.rF2Telemetry, logger)
         self._info_ext = rF2MMap(
-            "$rFactor2SMMP_Extended$", rF2data.rF2Extended, logger)
+            MMAP_NAMES["extended"], rF2data.rF2Extended, logger)
         self._info_ffb = rF2MMap(
-            "$rFactor2SMMP_ForceFeedback$", rF2data.rF2ForceFeedback, logger)
+            MMAP_NAMES["ffb"], rF2data.rF2ForceFeedback, logger)
+        self._mmap_infos = {
+            "scoring": self._info_scor,
+            "telemetry": self._info_tele,
+            "extended": self._info_ext,
+            "ffb": self._info_ffb,
+        }
 
     def create_mmap(self):
-        """Create mmap instance"""
-        self._info_scor.create(self._access_mode, self._rf2_pid)
-        self._info_tele.create(self._access_mode, self._rf2_pid)
-        self._info_ext.create(self._access_mode, self._rf2_pid)
-        self._info_ffb.create(self._access_mode, self._rf2_pid)
+        """Create mmap instance of mapped buffers"""
+        for name in self._active:
+            self._mmap_infos[name].create(self._access_mode, self._rf2_pid)
 
     def close_mmap(self):
-        """Close mmap instance"""
-        self._info_scor.close()
-        self._info_tele.close()
-        self._info_ext.close()
-        self._info_ffb.close()
+        """Close mmap instance of mapped buffers"""
+        with self._demand_lock:
+            for name in self._active:
+                self._mmap_infos[name].close()
 
     def update_mmap(self):
-        """Update mmap data"""
-        self._info_scor.update()
-        self._info_tele.update()
-        self._info_ext.update()
-        self._info_ffb.update()
+        """Update mmap data of mapped buffers"""
+        for name in self._active:
+            self._mmap_infos[name].update()
 
     def copy_mmap_player(self):
         """Copy memory mapping player data
@@ -332,8 +771,8 @@ class SimInfoSync():
         Maintain a separate copy of synchronized local player's data
         which avoids data interruption or desync in case of player index changes.
         """
-        self._player_scor = copy.deepcopy(self._info_scor.data.mVehicles[INVALID_INDEX])
-        self._player_tele = copy.deepcopy(self._info_tele.data.mVehicles[INVALID_INDEX])
+        self._player_scor = self._player_scor_pool.copy(self._info_scor.data.mVehicles[INVALID_INDEX])
+        self._player_tele = self._player_tele_pool.copy(self._info_tele.data.mVehicles[INVALID_INDEX])
 
     def setPID(self, pid=""):
         """Set rf2 PID"""
@@ -357,6 +796,58 @@ class SimInfoSync():
             return self._player_scor_index == idx
         return self._info_scor.data.mVehicles[idx].mIsPlayer
 
+    @property
+    def buffers(self):
+        """rF2 mmap info by buffer name"""
+        return dict(self._mmap_infos)
+
+    @property
+    def subscriptions(self):
+        """Mapping state of every buffer"""
+        now = time.monotonic()
+        active = self._active
+        with self._demand_lock:
+            owners = {name: len(owners) for name, owners in self._owners.items()}
+        return {
+            name: {
+                "mapped": name in active,
+                "core": name in CORE_BUFFERS,
+                "owners": owners.get(name, 0),
+                "idle_seconds": (
+                    now - self._touched[name] if name in self._touched else None),
+            }
+            for name in self._mmap_infos
+        }
+
+    @property
+    def stats(self):
+        """Updating loop counters and pause/unpause transitions"""
+        return {
+            "loops": self._loops,
+            "loop_seconds": self._loop_seconds,
+            "active": not self._paused,
+            "transitions": dict(self._transitions),
+        }
+
+    @property
+    def snapshot(self):
+        """Latest published Snapshot of all buffers, None before start
+
+        Get it once and read every buffer from it for a consistent view,
+        safe in both access modes.
+        """
+        return self._snapshot
+
+    @property
+    def scheduler(self):
+        """Poll scheduler, observed buffer update rates in scheduler.stats"""
+        return self._scheduler
+
+    @property
+    def recorder(self):
+        """Active SnapshotRecorder, None if not recording"""
+        return self._recorder
+
     @property
     def rf2Scor(self):
         """rF2 scoring data"""
@@ -369,12 +860,14 @@ class SimInfoSync():
 
     @property
     def rf2Ext(self):
-        """rF2 extended data"""
+        """rF2 extended data, mapped on access"""
+        self.touchBuffer("extended")
         return self._info_ext.data
 
     @property
     def rf2Ffb(self):
-        """rF2 force feedback data"""
+        """rF2 force feedback data, mapped on access"""
+        self.touchBuffer("ffb")
         return self._info_ffb.data
 
     def rf2ScorVeh(self, index: int = None):
@@ -397,6 +890,28 @@ class SimInfoSync():
             return self._player_tele
         return self._info_tele.data.mVehicles[index]
 
+    def rf2ScorArray(self, active=True):
+        """rF2 vehicle scoring data as NumPy structured array
+
+        Zero-copy view over current scoring snapshot (requires numpy),
+        never the live mapping of direct access mode.
+        active: only active vehicles, otherwise all mapped vehicle slots.
+        """
+        if rf2_numpy is None:
+            raise ImportError("numpy is required for array views")
+        return rf2_numpy.vehicles_view(self._snapshot.scoring, active)
+
+    def rf2TeleArray(self, active=True):
+        """rF2 vehicle telemetry data as NumPy structured array
+
+        Zero-copy view over current telemetry snapshot (requires numpy),
+        never the live mapping of direct access mode.
+        active: only active vehicles, otherwise all mapped vehicle slots.
+        """
+        if rf2_numpy is None:
+            raise ImportError("numpy is required for array views")
+        return rf2_numpy.vehicles_view(self._snapshot.telemetry, active)
+
     @property
     def playerTeleIndex(self):
         """rF2 local player's telemetry index"""
@@ -0,0 +1,287 @@
+"""
+Direct ctypes to JSON serializer
+
+Generate one encoder function per rF2 structure from the `_fields_` tables
+in rf2_data, once at startup. Each encoder unpacks all scalar values of a
+structure with a single precompiled struct.Struct call and builds the JSON
+document from them, instead of walking the structure with getattr and
+isinstance checks (CDataJSONEncoder) and re-validating the result with pydantic.
+
+Output matches the response models in model.py:
+only fields declared in the model with the same name are emitted.
+Vehicle arrays are bounded by the active vehicle count of the buffer,
+unused vehicle slots are never read unless padded output is requested.
+"""
+import ctypes
+import json
+import functools
+import struct
+from pydantic import BaseModel
+
+import model
+from model import Cbytestring2Python
+from rf2_data.buffers import VEHICLE_COUNTS, vehicle_count
+
+# Arrays of structures up to this length are inlined into parent encoder,
+# longer ones (vehicles, tracked damages) get their own encoder function
+INLINE_ARRAY_LIMIT = 16
+
+_FLOAT_CODES = {"d": "d", "f": "f", "?": "?", "c": "c"}
+_INT_CODES = {
+    (1, True): "b", (1, False): "B",
+    (2, True): "h", (2, False): "H",
+    (4, True): "i", (4, False): "I",
+    (8, True): "q", (8, False): "Q",
+}
+
+def struct_code(ctype):
+    """struct module format code of a simple ctypes type"""
+    code = ctype._type_
+    if code in _FLOAT_CODES:
+        return _FLOAT_CODES[code]
+    try:
+        return _INT_CODES[(ctypes.sizeof(ctype), code.islower())]
+    except KeyError:
+        raise TypeError(f"unsupported ctypes type: {ctype.__name__}") from None
+
+
+def model_fields(ctype):
+    """Names of fields emitted for ctype
+
+    Fields declared in the matching model.py response model,
+    or all public fields if there is no such model.
+    """
+    response_model = getattr(model, ctype.__name__, None)
+    if isinstance(response_model, type) and issubclass(response_model, BaseModel):
+        return set(response_model.model_fields)
+    return {name for name, *_ in ctype._fields_ if not name.startswith("_")}
+
+
+def field_type(ctype, name):
+    """ctypes type of a structure field"""
+    for field_name, ftype, *_ in ctype._fields_:
+        if field_name == name:
+            return ftype
+    raise KeyError(name)
+
+
+def element_type(ctype):
+    """Structure type a field selection descends into, None for values"""
+    while issubclass(ctype, ctypes.Array):
+        ctype = ctype._type_
+    if issubclass(ctype, ctypes.Structure):
+        return ctype
+    return None
+
+
+def parse_fields(ctype, fields):
+    """Parse dotted field paths into a nested selection dict
+
+    fields: iterable of dotted paths relative to ctype,
+        ex. ("mNumVehicles", "mVehicles.mWheels.mTemperature").
+        Arrays of structures are transparent, a path continues
+        with the fields of the array element.
+
+    Returns nested dict of field name -> sub selection,
+    where None selects the whole field.
+    Raises ValueError on unknown fields.
+    """
+    selection = {}
+    for path in fields:
+        names = path.split(".")
+        node = selection
+        node_type = ctype
+        for depth, name in enumerate(names):
+            if node_type is None:
+                raise ValueError(f"{'.'.join(names[:depth])} has no fields")
+            if name not in model_fields(node_type):
+                raise ValueError(f"unknown field: {'.'.join(names[:depth + 1])}")
+            if depth == len(names) - 1:
+                node[name] = None
+                break
+            if name in node and node[name] is None:
+                break  # whole field already selected
+            node = node.setdefault(name, {})
+            node_type = element_type(field_type(node_type, name))
+    return selection
+
+
+def freeze_selection(selection):
+    """Hashable form of a selection dict"""
+    if selection is None:
+        return None
+    return tuple(sorted((name, freeze_selection(sub)) for name, sub in selection.items()))
+
+
+class _Layout:
+    """Flat struct format of all values unpacked by one encoder"""
+
+    def __init__(self):
+        self._parts = ["<"]
+        self._position = 0
+        self.count = 0
+
+    def add(self, offset, code, length=1):
+        """Add value(s) at byte offset, return index of first unpacked item"""
+        if offset > self._position:
+            self._parts.append(f"{offset - self._position}x")
+        fmt = f"{length}{code}" if length > 1 else code
+        self._parts.append(fmt)
+        self._position = offset + struct.calcsize("<" + fmt)
+        index = self.count
+        self.count += 1 if code == "s" else length
+        return index
+
+    @property
+    def format(self):
+        return "".join(self._parts)
+
+
+class _Compiler:
+    """Generate encoder functions source for ctypes structures"""
+
+    def __init__(self):
+        self.namespace = {"_str": Cbytestring2Python}
+        self._functions = {}
+
+    def function(self, ctype, selection=None):
+        """Get (compile if needed) encoder function name of ctype
+
+        selection: nested dict of selected field names (see parse_fields),
+            None for all fields.
+
+        Encoder signature: (buf, off, count=None) -> dict, where buf is
+        the buffer holding the structure, off is the byte offset of the
+        structure and count is the number of mVehicles entries to emit
+        (None for all), if ctype has a vehicle count field.
+        """
+        key = (ctype, freeze_selection(selection))
+        name = self._functions.get(key)
+        if name is not None:
+            return name
+        name = f"_encode_{ctype.__name__}"
+        if selection is not None:
+            name = f"{name}_{len(self._functions)}"
+        self._functions[key] = name
+
+        layout = _Layout()
+        bounded = "mVehicles" if ctype in VEHICLE_COUNTS else None
+        expr = self._struct_expr(ctype, 0, layout, selection, bounded)
+        unpack = name.replace("_encode_", "_unpack_", 1)
+        self.namespace[unpack] = struct.Struct(layout.format).unpack_from
+        source = (
+            f"def {name}(buf, off, count=None):\n"
+            f"    v = {unpack}(buf, off)\n"
+            f"    return {expr}\n"
+        )
+        exec(compile(source, f"<serializer {name}>", "exec"), self.namespace)
+        return name
+
+    def _struct_expr(self, ctype, offset, layout, selection=None, bounded=None):
+        fields = model_fields(ctype)
+        items = []
+        for name, ftype, *_ in ctype._fields_:
+            if name not in fields:
+                continue
+            if selection is None:
+                sub_selection = None
+            elif name in selection:
+                sub_selection = selection[name]
+            else:
+                continue
+            field_offset = offset + getattr(ctype, name).offset
+            expr = self._value_expr(
+                ftype, field_offset, layout, sub_selection, name == bounded)
+            items.append(f"{name!r}: {expr}")
+        return "{" + ", ".join(items) + "}"
+
+    def _value_expr(self, ftype, offset, layout, selection=None, bounded=False):
+        if issubclass(ftype, ctypes.Structure):
+            return self._struct_expr(ftype, offset, layout, selection)
+
+        if issubclass(ftype, ctypes.Array):
+            etype = ftype._type_
+            length = ftype._length_
+            if etype is ctypes.c_char:
+                return f"_str(v[{layout.add(offset, 's', length)}])"
+            if issubclass(etype, ctypes.Structure):
+                size = ctypes.sizeof(etype)
+                if length <= INLINE_ARRAY_LIMIT and not bounded:
+                    return "[" + ", ".join(
+                        self._struct_expr(etype, offset + i * size, layout, selection)
+                        for i in range(length)) + "]"
+                func = self.function(etype, selection)
+                count = f"{length} if count is None else count" if bounded else length
+                return (f"[{func}(buf, off + {offset} + i * {size}) "
+                        f"for i in range({count})]")
+            if issubclass(etype, ctypes.Array):
+                return "[" + ", ".join(
+                    self._value_expr(etype, offset + i * ctypes.sizeof(etype), layout)
+                    for i in range(length)) + "]"
+            index = layout.add(offset, struct_code(etype), length)
+            return f"list(v[{index}:{index + length}])"
+
+        code = struct_code(ftype)
+        index = layout.add(offset, code)
+        if code == "c":
+            return f"_str(v[{index}])"
+        return f"v[{index}]"
+
+
+_compiler = _Compiler()
+
+
+class Serializer:
+    """JSON serializer of a rF2 ctypes structure
+
+    ctype: rf2 data class defined in rF2data.py, ex. rF2data.rF2Scoring
+    fields: dotted field paths to emit (see parse_fields), None for all fields
+    """
+
+    def __init__(self, ctype, fields=None):
+        self._ctype = ctype
+        if fields is None:
+            selection = None
+            compiler = _compiler
+        else:
+            # Own compiler, generated code is released with the projection
+            selection = parse_fields(ctype, fields)
+            compiler = _Compiler()
+        self._encode = compiler.namespace[compiler.function(ctype, selection)]
+
+    def encode(self, data, padded=False):
+        """Convert ctypes structure to JSON compatible Python object
+
+        padded: emit all mapped vehicle slots instead of active ones only
+        """
+        count = None if padded else vehicle_count(data)
+        return self._encode(data, 0, count)
+
+    def dumps(self, data, padded=False):
+        """Serialize ctypes structure to JSON response bytes
+
+        Same encoding as FastAPI/Starlette JSONResponse.
+        """
+        return json.dumps(
+            self.encode(data, padded),
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=128)
+def projection(ctype, fields):
+    """Get cached serializer of ctype emitting only selected fields
+
+    fields: tuple of dotted field paths, normalized (sorted, unique)
+        so equivalent projections share one compiled serializer,
+        empty for all fields.
+    """
+    return Serializer(ctype, fields or None)
+
+
+def normalize_fields(fields):
+    """Normalize comma separated field paths into a projection key"""
+    return tuple(sorted({path.strip() for path in fields.split(",") if path.strip()}))
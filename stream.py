@@ -0,0 +1,253 @@
+"""
+Push stream of shared memory buffer updates
+
+SimInfoSync notifies the Broadcaster of every new buffer version from its
+updating thread. The broadcaster serializes each version once per distinct
+(buffer, vehicle set, frame format) subscription in its own thread, and fans
+the same frame out to all matching subscribers on the asyncio event loop.
+Frames are sent as WebSocket messages or Server-Sent Events.
+
+Every subscriber has a small bounded queue,
+slow consumers lose their oldest frames instead of growing memory.
+"""
+import asyncio
+import logging
+import threading
+
+# Buffers supporting vehicle filtering
+VEHICLE_BUFFERS = ("scoring", "telemetry")
+
+# Seconds without event before sending a SSE keep-alive comment
+SSE_KEEP_ALIVE = 15
+
+
+def websocket_frame(name, version, body):
+    """WebSocket message: buffer name, version and JSON body"""
+    return f'{{"buffer":"{name}","version":{version},"data":{body}}}'
+
+
+def sse_event(name, version, body):
+    """Server-Sent Event: version as id, buffer name as event type"""
+    return f"id: {version}\nevent: {name}\ndata: {body}\n\n"
+
+
+def parse_request(message):
+    """Parse subscription request message
+
+    Message: {"buffers": ["scoring", "telemetry"], "vehicles": [mID, ...]},
+    vehicles is optional (all vehicles).
+    Returns (buffers, vehicles), raises ValueError on invalid message.
+    """
+    if not isinstance(message, dict):
+        raise ValueError("subscription must be a JSON object")
+    buffers = message.get("buffers")
+    if (not isinstance(buffers, list) or not buffers
+            or not all(isinstance(name, str) for name in buffers)):
+        raise ValueError("buffers must be a non-empty list of buffer names")
+    vehicles = message.get("vehicles")
+    if vehicles is not None and (
+            not isinstance(vehicles, list)
+            or not all(isinstance(mid, int) and not isinstance(mid, bool) for mid in vehicles)):
+        raise ValueError("vehicles must be a list of vehicle mID")
+    return buffers, vehicles
+
+
+async def send_frames(websocket, subscriber):
+    """Send subscriber frames to websocket until cancelled"""
+    while True:
+        await websocket.send_text(await subscriber.get())
+
+
+async def sse_events(broadcaster, subscriber, max_rate):
+    """Yield subscriber events, at most max_rate per second
+
+    Subscriber queue should hold a single frame, so events arriving
+    faster than max_rate are coalesced into the latest one.
+    Unsubscribe when client disconnects.
+    """
+    interval = 1 / max_rate
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.get(), SSE_KEEP_ALIVE)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield event
+            await asyncio.sleep(interval)
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+class Subscriber:
+    """Stream subscriber
+
+    buffers: buffer names, ex. ("scoring", "telemetry")
+    vehicles: vehicle mIDs to include, None for all vehicles
+    queue_size: maximum number of frames waiting to be sent
+    frame_format: function(name, version, body) creating frame text
+    """
+
+    def __init__(self, buffers, vehicles=None, queue_size=4, frame_format=websocket_frame):
+        self.buffers = frozenset(buffers)
+        self.vehicles = None if vehicles is None else frozenset(vehicles)
+        self.frame_format = frame_format
+        self.dropped = 0
+        self.active = True
+        self._queue = asyncio.Queue(queue_size)
+
+    def put(self, frame):
+        """Queue frame, drop oldest frame if consumer is behind
+
+        Must be called from event loop thread.
+        """
+        if not self.active:
+            return None
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(frame)
+
+    async def get(self):
+        """Wait for next frame"""
+        return await self._queue.get()
+
+
+class Broadcaster:
+    """Serialize buffer updates once and fan them out to subscribers
+
+    builders: dict of buffer name -> builder(data, vehicles) returning
+        JSON body bytes, where vehicles is a frozenset of mIDs or None.
+    source: optional SimInfoSync, subscribed buffers are acquired from it
+        (acquireBuffer/releaseBuffer) while they have subscribers.
+    """
+
+    def __init__(self, builders, logger=__name__, source=None):
+        self._builders = builders
+        self._source = source
+        self._logger = logging.getLogger(logger)
+        self._loop = None
+        self._thread = None
+        self._running = False
+        self._wakeup = threading.Condition()
+        self._subscribers = set()
+        self._latest = {}   # latest data by buffer name
+        self._pending = {}  # new data waiting to be broadcast
+        self._initial = []  # (subscriber, name) waiting for first frame
+        self.frames = 0
+        self.published = 0
+
+    def start(self, loop):
+        """Start broadcasting thread, frames are delivered on loop"""
+        if self._running:
+            return None
+        self._loop = loop
+        self._running = True
+        self._thread = threading.Thread(target=self.__run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop broadcasting thread"""
+        with self._wakeup:
+            self._running = False
+            self._wakeup.notify()
+        if self._thread:
+            self._thread.join()
+
+    def publish(self, name, data):
+        """Publish new buffer data version
+
+        SimInfoSync listener, called from its updating thread.
+        """
+        with self._wakeup:
+            self._latest[name] = data
+            if any(name in sub.buffers for sub in self._subscribers):
+                self._pending[name] = data
+                self._wakeup.notify()
+
+    def subscribe(self, buffers, vehicles=None, queue_size=4, frame_format=websocket_frame):
+        """Add subscriber, latest version of each buffer is sent first"""
+        unknown = set(buffers) - set(self._builders)
+        if unknown:
+            raise ValueError(f"unknown buffer: {', '.join(sorted(unknown))}")
+        subscriber = Subscriber(buffers, vehicles, queue_size, frame_format)
+        if self._source is not None:
+            for name in subscriber.buffers:
+                self._source.acquireBuffer(name, subscriber)
+        with self._wakeup:
+            self._subscribers.add(subscriber)
+            self._initial.extend(
+                (subscriber, name) for name in subscriber.buffers if name in self._latest)
+            self._wakeup.notify()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Remove subscriber"""
+        subscriber.active = False
+        with self._wakeup:
+            self._subscribers.discard(subscriber)
+        if self._source is not None:
+            for name in subscriber.buffers:
+                self._source.releaseBuffer(name, subscriber)
+
+    @property
+    def stats(self):
+        """Broadcasting counters"""
+        subscribers = list(self._subscribers)
+        return {
+            "subscribers": len(subscribers),
+            "published": self.published,
+            "frames": self.frames,
+            "dropped": sum(sub.dropped for sub in subscribers),
+        }
+
+    def __frame(self, name, data, vehicles, frame_format):
+        """Serialize one stream frame"""
+        body = self._builders[name](data, vehicles)
+        self.frames += 1
+        return frame_format(name, data.mVersionUpdateEnd, body.decode("utf-8"))
+
+    def __run(self):
+        """Broadcasting thread"""
+        while True:
+            with self._wakeup:
+                while self._running and not self._pending and not self._initial:
+                    self._wakeup.wait()
+                if not self._running:
+                    return None
+                pending, self._pending = self._pending, {}
+                initial, self._initial = self._initial, []
+                latest = dict(self._latest)
+                subscribers = list(self._subscribers)
+
+            deliveries = []
+            for name, data in pending.items():
+                self.published += 1
+                frames = {}
+                for sub in subscribers:
+                    if name in sub.buffers:
+                        deliveries.append((sub, self.__get_frame(frames, name, data, sub)))
+            for sub, name in initial:
+                deliveries.append((sub, self.__get_frame({}, name, latest[name], sub)))
+
+            deliveries = [(sub, frame) for sub, frame in deliveries if frame is not None]
+            if deliveries:
+                self._loop.call_soon_threadsafe(self.__deliver, deliveries)
+
+    def __get_frame(self, frames, name, data, subscriber):
+        """Get frame for subscriber, serialize once per vehicle set and format"""
+        vehicles = subscriber.vehicles if name in VEHICLE_BUFFERS else None
+        key = (vehicles, subscriber.frame_format)
+        if key not in frames:
+            try:
+                frames[key] = self.__frame(name, data, vehicles, subscriber.frame_format)
+            except Exception:
+                self._logger.exception("stream - failed to serialize %s", name)
+                frames[key] = None
+        return frames[key]
+
+    @staticmethod
+    def __deliver(deliveries):
+        """Queue frames to subscribers (event loop thread)"""
+        for subscriber, frame in deliveries:
+            subscriber.put(frame)